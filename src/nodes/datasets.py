@@ -4,19 +4,67 @@ This node:
 1. Loads the mapping configuration from mappings/datasets.json
 2. For each dataset in the mapping, loads the relevant raw series data
 3. Pivots from skinny format to wide format (date as index, series as columns)
-4. Uploads each dataset as a separate Delta table
+4. Uploads each dataset as a separate Delta table, keyed and sorted by
+   (period_start, frequency) — a typed companion to the free-form date
 
 Uses state diff to only process series that have been updated since last transform.
 """
+import bisect
+import hashlib
 import json
 import re
+from datetime import date as Date
 import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 from collections import defaultdict
-from subsets_utils import load_raw_json, load_state, save_state, merge, validate, publish
+from typing import Iterator, NamedTuple
+from subsets_utils import (
+    load_raw_many, load_state, save_state, merge, overwrite, validate, publish,
+    data_hash, table_schema, WriterPool, WriteProfile,
+)
 
 MAPPINGS_DIR = Path(__file__).parent.parent / "mappings"
 
+# Dates per record batch in streaming mode. Each batch is date-range
+# contiguous, so peak memory is one batch of wide rows plus the compact
+# per-series Arrow columns, independent of history length.
+CHUNK_ROWS = 5_000
+
+# Merge key of the wide tables. `date` stays as the human-readable label,
+# but its string order mixes formats and compares as text; period_start is
+# a date32 so Delta's min/max stats prune files for range queries and the
+# merge's key-range predicate.
+KEY = ["period_start", "frequency"]
+
+# Datasets transformed and written at once. Each holds all its series
+# arrays plus a stream, and a streamed merge can't retry a commit
+# conflict, so one at a time keeps peak memory at one dataset.
+WRITE_CONCURRENCY = 1
+
+# Wide float tables: ZSTD shrinks them ~15% over the default snappy, and
+# materialized tables are sorted by the key (streams already are).
+WRITE_PROFILE = WriteProfile(zstd_level=9, sort_by=KEY)
+
+# Date formats after normalize_date(), with the frequency each implies
+_PERIOD_FORMATS = [
+    (re.compile(r'^(\d{4})-(\d{2})-(\d{2})$'), "daily"),
+    (re.compile(r'^(\d{4})-(\d{2})$'), "monthly"),
+    (re.compile(r'^(\d{4})-?Q([1-4])$'), "quarterly"),
+    (re.compile(r'^(\d{4})$'), "annual"),
+]
+
+# Configured frequencies whose dates use one of those formats
+_FREQUENCY_FORMATS = {
+    "daily": "daily",
+    "weekly": "daily",
+    "monthly": "monthly",
+    "quarterly": "quarterly",
+    "annual": "annual",
+    "biennial": "annual",
+    "triennial": "annual",
+}
+
 def normalize_date(date: str, frequency: str) -> str:
     """
     Normalize dates to ISO 8601 format based on frequency.
@@ -52,30 +100,118 @@ def normalize_date(date: str, frequency: str) -> str:
     # Already in correct format or unknown - return as-is
     return date
 
+def parse_period(date: str, frequency: str) -> tuple[Date | None, str | None]:
+    """
+    Period start and frequency label for a normalized date.
+
+    - YYYY-MM-DD -> that day
+    - YYYY-MM -> first of the month
+    - YYYY-QN / YYYYQN -> first day of the quarter
+    - YYYY -> January 1st
+
+    The label is the configured frequency when the date is in that
+    frequency's format, else the one the format implies (so "mixed"
+    datasets get a label per row and the pair stays unique per date).
+    Unrecognized dates return (None, None).
+    """
+    for pattern, implied in _PERIOD_FORMATS:
+        match = pattern.match(date)
+        if not match:
+            continue
+        parts = match.groups()
+        year = int(parts[0])
+        try:
+            if implied == "daily":
+                start = Date(year, int(parts[1]), int(parts[2]))
+            elif implied == "monthly":
+                start = Date(year, int(parts[1]), 1)
+            elif implied == "quarterly":
+                start = Date(year, (int(parts[1]) - 1) * 3 + 1, 1)
+            else:
+                start = Date(year, 1, 1)
+        except ValueError:
+            # Right shape, impossible date (2020-13, 2021-02-30, 0000)
+            return None, None
+        label = frequency if _FREQUENCY_FORMATS.get(frequency) == implied else implied
+        return start, label
+    return None, None
+
+def period_order(dates, frequency: str) -> tuple[list[str], list, list]:
+    """Sort dates by (period_start, frequency).
+
+    Returns (dates, period starts, frequency labels), aligned. Unparseable
+    dates sort last, by their string.
+    """
+    keyed = sorted(
+        ((*parse_period(d, frequency), d) for d in dates),
+        key=lambda k: (k[0] is None, k[0] or Date.min, k[1] or "", k[2]),
+    )
+    return [k[2] for k in keyed], [k[0] for k in keyed], [k[1] for k in keyed]
+
+def keyed_periods(dataset_id: str, dates, frequency: str) -> tuple[list[str], list, list]:
+    """period_order() without the dates it can't parse.
+
+    Those rows would have a null key, which the merge can't match; they
+    are logged and dropped here instead of failing validation.
+    """
+    ordered, starts, labels = period_order(dates, frequency)
+    dropped = sum(1 for start in starts if start is None)
+    if dropped:
+        # Unparseable dates sort last
+        print(f"  {dataset_id}: dropping {dropped} row(s) with unparseable dates: {ordered[-dropped:][:5]}")
+        ordered, starts, labels = ordered[:-dropped], starts[:-dropped], labels[:-dropped]
+    return ordered, starts, labels
+
 def load_mapping() -> dict:
     """Load the dataset mapping configuration."""
     mapping_path = MAPPINGS_DIR / "datasets.json"
     with open(mapping_path) as f:
         return json.load(f)
 
-def load_raw_series(series_code: str) -> list[dict]:
-    """Load raw data for a single series."""
-    try:
-        return load_raw_json(f"series/{series_code}")
-    except FileNotFoundError:
-        return []
+def load_raw_series_many(series_codes) -> Iterator[tuple[str, list[dict]]]:
+    """Load raw data for many series concurrently. Yields (series_code, data)
+    as batches arrive, not in input order; [] for missing series."""
+    for asset_id, data in load_raw_many([f"series/{code}" for code in series_codes]):
+        yield asset_id[len("series/"):], data or []
+
+def parse_observations(raw_data: list[dict], frequency: str) -> dict[str, float]:
+    """Parse raw observations into {normalized_date: value}.
+
+    Non-numeric values are skipped; when several observations normalize to
+    the same date the last one wins.
+    """
+    values = {}
+    for obs in raw_data:
+        date = obs.get("date")
+        value_str = obs.get("value")
+
+        if not date or value_str is None:
+            continue
+
+        # Normalize date format based on frequency
+        date = normalize_date(date, frequency)
+
+        # Try to convert to float, keep as string if not numeric
+        try:
+            value = float(value_str)
+        except (ValueError, TypeError):
+            # Some series have string values (like dates), skip these
+            continue
+
+        values[date] = value
+    return values
 
 def test_wide_table(table: pa.Table, dataset_id: str, config: dict) -> None:
     """Validate a wide-format dataset."""
     # Build expected columns
-    expected_columns = {"date": "string"}
+    expected_columns = {"date": "string", "period_start": "date32", "frequency": "string"}
     for series_config in config["series"].values():
         expected_columns[series_config["column"]] = "double"
 
     # Validate schema and basic constraints
     validate(table, {
         "columns": expected_columns,
-        "not_null": ["date"],
+        "not_null": ["date", *KEY],
         "min_rows": 1,
     })
 
@@ -107,7 +243,7 @@ def test_wide_table(table: pa.Table, dataset_id: str, config: dict) -> None:
             assert d.isdigit(), f"Annual date should be numeric: {d}"
 
     # Check that we have data in at least some columns (not all null)
-    non_date_cols = [c for c in table.column_names if c != "date"]
+    non_date_cols = [c for c in table.column_names if c != "date" and c not in KEY]
     has_data = False
     for col in non_date_cols:
         non_null_count = len(table) - table.column(col).null_count
@@ -117,6 +253,19 @@ def test_wide_table(table: pa.Table, dataset_id: str, config: dict) -> None:
 
     assert has_data, f"Dataset {dataset_id} has no data in any column"
 
+def wide_schema(all_columns: list[str]) -> pa.Schema:
+    """date label, typed key, then one float64 column per series."""
+    # Key columns are nullable in the schema; test_wide_table rejects nulls
+    # with a readable message instead of an Arrow cast error.
+    schema_fields = [
+        pa.field("date", pa.string(), nullable=False),
+        pa.field("period_start", pa.date32()),
+        pa.field("frequency", pa.string()),
+    ]
+    for col in all_columns:
+        schema_fields.append(pa.field(col, pa.float64(), nullable=True))
+    return pa.schema(schema_fields)
+
 def transform_dataset(dataset_id: str, config: dict) -> pa.Table | None:
     """
     Transform a single dataset from skinny to wide format.
@@ -137,9 +286,8 @@ def transform_dataset(dataset_id: str, config: dict) -> pa.Table | None:
     series_found = 0
     series_missing = []
 
-    for series_code, series_config in series_mapping.items():
-        column_name = series_config["column"]
-        raw_data = load_raw_series(series_code)
+    for series_code, raw_data in load_raw_series_many(series_mapping):
+        column_name = series_mapping[series_code]["column"]
 
         if not raw_data:
             series_missing.append(series_code)
@@ -147,23 +295,7 @@ def transform_dataset(dataset_id: str, config: dict) -> pa.Table | None:
 
         series_found += 1
 
-        for obs in raw_data:
-            date = obs.get("date")
-            value_str = obs.get("value")
-
-            if not date or value_str is None:
-                continue
-
-            # Normalize date format based on frequency
-            date = normalize_date(date, config.get("frequency", ""))
-
-            # Try to convert to float, keep as string if not numeric
-            try:
-                value = float(value_str)
-            except (ValueError, TypeError):
-                # Some series have string values (like dates), skip these
-                continue
-
+        for date, value in parse_observations(raw_data, config.get("frequency", "")).items():
             date_rows[date][column_name] = value
 
     if not date_rows:
@@ -173,31 +305,184 @@ def transform_dataset(dataset_id: str, config: dict) -> pa.Table | None:
     if series_missing:
         print(f"  {dataset_id}: Missing {len(series_missing)} series: {series_missing[:5]}{'...' if len(series_missing) > 5 else ''}")
 
-    # Build rows with date + all columns
+    # Build rows with date + key + all columns, in key order
     all_columns = [series_config["column"] for series_config in series_mapping.values()]
     rows = []
 
-    for date in sorted(date_rows.keys()):
-        row = {"date": date}
+    for date, start, label in zip(*keyed_periods(dataset_id, date_rows.keys(), config.get("frequency", ""))):
+        row = {"date": date, "period_start": start, "frequency": label}
         for col in all_columns:
             row[col] = date_rows[date].get(col)  # None if missing
         rows.append(row)
 
-    # Build schema: date as string, all other columns as float64 (nullable)
-    schema_fields = [pa.field("date", pa.string(), nullable=False)]
-    for col in all_columns:
-        schema_fields.append(pa.field(col, pa.float64(), nullable=True))
+    if not rows:
+        print(f"  {dataset_id}: No data found")
+        return None
 
-    schema = pa.schema(schema_fields)
-    table = pa.Table.from_pylist(rows, schema=schema)
+    table = pa.Table.from_pylist(rows, schema=wide_schema(all_columns))
 
     print(f"  {dataset_id}: {len(table)} rows, {series_found}/{len(series_mapping)} series")
 
     return table
 
+class WideStream(NamedTuple):
+    """A wide dataset as a stream, from transform_dataset_stream()."""
+    reader: pa.RecordBatchReader
+    fingerprint: str
+    failures: list
+    period_range: tuple
+
+def transform_dataset_stream(
+    dataset_id: str, config: dict, chunk_rows: int = CHUNK_ROWS
+) -> WideStream | None:
+    """
+    Transform a single dataset to wide format as a stream of date-range batches.
+
+    Each series is held as a pair of Arrow arrays (row numbers, values)
+    sorted by the key instead of per-date Python dicts, and wide rows are
+    only materialized one batch of `chunk_rows` dates at a time.
+
+    The first batch is validated eagerly, so an AssertionError surfaces
+    before any write starts. Later batches are validated as they are pulled
+    by the consumer; a failure there aborts the merge before it commits.
+    The consumer (deltalake) wraps it in its own error, so the original
+    is also appended to the returned `failures` list.
+
+    Args:
+        dataset_id: The output dataset identifier
+        config: Dataset configuration with title, description, frequency, series mapping
+        chunk_rows: Number of dates per record batch
+
+    Returns:
+        WideStream (reader over the wide table in key order, content
+        fingerprint, validation failures, period_start bounds), or None if
+        no data. The fingerprint covers the column layout and every series'
+        observations, so merge() can skip the write when nothing changed
+        without draining the stream. The bounds let the merge scan only
+        that period range of the target.
+    """
+    series_mapping = config["series"]
+    frequency = config.get("frequency", "")
+
+    # Structure: {column_name: (sorted date array, value array)}
+    columns = {}
+    series_missing = []
+
+    for series_code, raw_data in load_raw_series_many(series_mapping):
+        series_config = series_mapping[series_code]
+
+        if not raw_data:
+            series_missing.append(series_code)
+            continue
+
+        values = parse_observations(raw_data, frequency)
+        del raw_data
+        if not values:
+            continue
+
+        dates = sorted(values)
+        columns[series_config["column"]] = (
+            pa.array(dates, pa.string()),
+            pa.array([values[d] for d in dates], pa.float64()),
+        )
+
+    if not columns:
+        print(f"  {dataset_id}: No data found")
+        return None
+
+    if series_missing:
+        print(f"  {dataset_id}: Missing {len(series_missing)} series: {series_missing[:5]}{'...' if len(series_missing) > 5 else ''}")
+
+    all_columns = [series_config["column"] for series_config in series_mapping.values()]
+    schema = wide_schema(all_columns)
+
+    fingerprint = hashlib.blake2b(digest_size=8)
+    # The schema is part of the content: a layout change must not be elided.
+    fingerprint.update(str(schema).encode())
+    for col in all_columns:
+        fingerprint.update(col.encode())
+        if col in columns:
+            dates, values = columns[col]
+            fingerprint.update(data_hash(pa.table({"date": dates, "value": values})).encode())
+
+    # Union of all observation dates in key order. Each series' dates are
+    # replaced by their row number in that order, so a batch is a row range
+    # and each series is sliced to it by binary search.
+    union = pc.unique(pa.chunked_array([dates for dates, _ in columns.values()]))
+    ordered, starts, labels = keyed_periods(dataset_id, union.to_pylist(), frequency)
+    if not ordered:
+        print(f"  {dataset_id}: No data found")
+        return None
+    row_of = {d: i for i, d in enumerate(ordered)}
+    for col, (dates, values) in columns.items():
+        # Dropped (unparseable) dates have no row
+        rows = pa.array([row_of.get(d) for d in dates.to_pylist()], pa.int64())
+        keep = pc.is_valid(rows)
+        rows, values = rows.filter(keep), values.filter(keep)
+        order = pc.sort_indices(rows)
+        columns[col] = (rows.take(order), values.take(order))
+    del row_of, union
+
+    all_dates = pa.array(ordered, pa.string())
+    all_starts = pa.array(starts, pa.date32())
+    all_labels = pa.array(labels, pa.string())
+
+    series_found = len(series_mapping) - len(series_missing)
+    print(f"  {dataset_id}: {len(all_dates)} rows, {series_found}/{len(series_mapping)} series (streaming)")
+
+    def as_py(scalar):
+        return scalar.as_py()
+
+    def wide_batches():
+        for start in range(0, len(all_dates), chunk_rows):
+            length = min(chunk_rows, len(all_dates) - start)
+            chunk = pa.array(range(start, start + length), pa.int64())
+
+            arrays = [
+                all_dates.slice(start, length),
+                all_starts.slice(start, length),
+                all_labels.slice(start, length),
+            ]
+            for col in all_columns:
+                if col not in columns:
+                    arrays.append(pa.nulls(length, pa.float64()))
+                    continue
+                # Slice the series to this row range, then align to the chunk
+                rows, values = columns[col]
+                i = bisect.bisect_left(rows, start, key=as_py)
+                j = bisect.bisect_left(rows, start + length, key=as_py)
+                positions = pc.index_in(chunk, value_set=rows.slice(i, j - i))
+                arrays.append(values.slice(i, j - i).take(positions))
+
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    batches = wide_batches()
+    first = next(batches)
+    test_wide_table(pa.Table.from_batches([first]), dataset_id, config)
+
+    failures: list[AssertionError] = []
+
+    def validated_batches():
+        yield first
+        for batch in batches:
+            try:
+                test_wide_table(pa.Table.from_batches([batch]), dataset_id, config)
+            except AssertionError as e:
+                failures.append(e)
+                raise
+            yield batch
+
+    reader = pa.RecordBatchReader.from_batches(schema, validated_batches())
+    # Rows are in key order, so the first and last period_start are the bounds
+    return WideStream(reader, fingerprint.hexdigest(), failures, (starts[0], starts[-1]))
+
 def make_metadata(dataset_id: str, config: dict) -> dict:
     """Generate metadata for a dataset."""
-    column_descriptions = {"date": "Observation date"}
+    column_descriptions = {
+        "date": "Observation date",
+        "period_start": "First day of the observation period",
+        "frequency": "Observation frequency (daily, monthly, quarterly, annual, ...)",
+    }
 
     for series_code, series_config in config["series"].items():
         column_descriptions[series_config["column"]] = series_config["description"]
@@ -210,7 +495,76 @@ def make_metadata(dataset_id: str, config: dict) -> dict:
         "column_descriptions": column_descriptions,
     }
 
-def run(dataset_filter: str | None = None):
+def needs_key_migration(dataset_id: str) -> bool:
+    """True if the published table predates the typed key columns."""
+    # Schema from the Delta log; no file listing
+    try:
+        columns = table_schema(dataset_id).names
+    except FileNotFoundError:
+        return False
+    return any(k not in columns for k in KEY)
+
+def upload(
+    source, dataset_id: str, metadata: dict,
+    fingerprint: str | None = None, period_range: tuple | None = None,
+) -> None:
+    """Merge on the typed key, or rewrite tables still keyed by date."""
+    if needs_key_migration(dataset_id):
+        print(f"  {dataset_id}: adding {KEY} key columns (full rewrite)")
+        overwrite(
+            source, dataset_id,
+            fingerprint=fingerprint, profile=WRITE_PROFILE, change_data_feed=True,
+        )
+        return
+    merge(
+        source, dataset_id, key=KEY,
+        fingerprint=fingerprint, profile=WRITE_PROFILE, change_data_feed=True,
+        metadata=metadata,
+        key_bounds={"period_start": period_range} if period_range else None,
+    )
+
+def write_dataset(dataset_id: str, config: dict, streaming: bool = True) -> bool:
+    """Transform, merge and publish one dataset. Returns False if skipped."""
+    metadata = make_metadata(dataset_id, config)
+    if streaming:
+        # Batches are validated as they stream; the first one before
+        # the merge starts.
+        try:
+            stream = transform_dataset_stream(dataset_id, config)
+        except AssertionError as e:
+            print(f"    Validation failed for {dataset_id}: {e}")
+            return False
+
+        if stream is None:
+            return False
+
+        try:
+            upload(stream.reader, dataset_id, metadata, stream.fingerprint, stream.period_range)
+        except Exception:
+            # A later batch failed validation inside the writer
+            if not stream.failures:
+                raise
+            print(f"    Validation failed for {dataset_id}: {stream.failures[0]}")
+            return False
+    else:
+        table = transform_dataset(dataset_id, config)
+
+        if table is None or len(table) == 0:
+            return False
+
+        # Validate before upload
+        try:
+            test_wide_table(table, dataset_id, config)
+        except AssertionError as e:
+            print(f"    Validation failed for {dataset_id}: {e}")
+            return False
+
+        # Upload (merge by key to handle incremental updates)
+        upload(table, dataset_id, metadata)
+    publish(dataset_id, metadata)
+    return True
+
+def run(dataset_filter: str | None = None, streaming: bool = True):
     """
     Transform all datasets defined in the mapping.
 
@@ -218,6 +572,8 @@ def run(dataset_filter: str | None = None):
 
     Args:
         dataset_filter: If provided, only transform datasets matching this prefix
+        streaming: Build each wide table in date-range batches and merge it as
+            a RecordBatchReader (default). False materializes the full table first.
     """
     print("Transforming datasets...")
 
@@ -255,32 +611,19 @@ def run(dataset_filter: str | None = None):
 
     print(f"  Processing {len(datasets)} datasets from mapping...")
 
-    success_count = 0
-    skip_count = 0
-
-    for dataset_id, config in datasets.items():
-        # Apply filter if provided
-        if dataset_filter and not dataset_id.startswith(dataset_filter):
-            continue
-
-        table = transform_dataset(dataset_id, config)
-
-        if table is None or len(table) == 0:
-            skip_count += 1
-            continue
+    selected = {
+        dataset_id: config for dataset_id, config in datasets.items()
+        if not dataset_filter or dataset_id.startswith(dataset_filter)
+    }
 
-        # Validate before upload
-        try:
-            test_wide_table(table, dataset_id, config)
-        except AssertionError as e:
-            print(f"    Validation failed for {dataset_id}: {e}")
-            skip_count += 1
-            continue
+    # Datasets are independent tables, written through a WriterPool sized
+    # by WRITE_CONCURRENCY.
+    with WriterPool(max_workers=WRITE_CONCURRENCY) as pool:
+        for dataset_id, config in selected.items():
+            pool.submit(write_dataset, dataset_id, config, streaming)
 
-        # Upload (merge by date to handle incremental updates)
-        merge(table, dataset_id, key="date")
-        publish(dataset_id, make_metadata(dataset_id, config))
-        success_count += 1
+    success_count = sum(1 for ok in pool.results if ok)
+    skip_count = len(selected) - success_count
 
     # Update transform state
     save_state("datasets", {
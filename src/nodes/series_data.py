@@ -5,24 +5,67 @@ This node:
 2. Incrementally fetches observations for each series
 3. Saves per-series JSON files to raw/
 4. Tracks fetched series in state for the datasets transform to diff against
+5. Merges new observations into the long-format `observations` table
 
 State tracks:
 - series_states: {series_code: {"last_date": "YYYY-MM-DD"}} for incremental updates
 - fetched_series: [series_code, ...] list of all series that have been fetched
+- observations: {series_code: frequency} for series whose full history is in
+  the observations table; the rest are backfilled from raw on their next visit
 """
 import csv
 import io
+import statistics
 import time
 import httpx
-from datetime import datetime, timedelta
+import pyarrow as pa
+from datetime import date, datetime, timedelta
 from tqdm import tqdm
-from subsets_utils import get, load_raw_file, load_raw_json, save_raw_json, load_state, save_state
+from subsets_utils import (
+    get, load_raw_file, load_raw_json, save_raw_json, state,
+    merge, publish, WriteProfile,
+)
 
 
 GH_ACTIONS_MAX_RUN_SECONDS = 5.5 * 60 * 60
 MAX_RETRIES = 3
 INITIAL_TIMEOUT = 60.0
 
+# Long-format table: one row per (series_id, date). Partitioned so a
+# single-series lookup (series_id = ..., plus its prefix) only lists and
+# reads one small directory; sorted by the key within each write.
+OBSERVATIONS_TABLE = "observations"
+OBSERVATIONS_KEY = ["series_id", "date"]
+OBSERVATIONS_PARTITIONS = ["frequency", "series_prefix"]
+OBSERVATIONS_PROFILE = WriteProfile(zstd_level=9, sort_by_key=True)
+OBSERVATIONS_SCHEMA = pa.schema([
+    pa.field("series_id", pa.string(), nullable=False),
+    pa.field("date", pa.date32(), nullable=False),
+    pa.field("value", pa.float64()),
+    pa.field("frequency", pa.string(), nullable=False),
+    pa.field("series_prefix", pa.string(), nullable=False),
+])
+OBSERVATIONS_METADATA = {
+    "id": OBSERVATIONS_TABLE,
+    "title": "Bank of Canada: All Series Observations",
+    "description": (
+        "Every Bank of Canada Valet series in long format, one row per series "
+        "and observation date. Filter on series_prefix (first two characters "
+        "of series_id) and frequency to read a single partition."
+    ),
+    "license": "Bank of Canada Terms of Use",
+    "column_descriptions": {
+        "series_id": "Valet series code",
+        "date": "Observation date (quarters as their first day)",
+        "value": "Observation value; null when not numeric",
+        "frequency": "Frequency inferred from the spacing of observation dates",
+        "series_prefix": "First two characters of series_id (partition column)",
+    },
+}
+
+# Buffered observation rows merged per write
+OBSERVATIONS_FLUSH_ROWS = 500_000
+
 
 def parse_series_csv(csv_text: str) -> list[dict]:
     """Parse Bank of Canada series CSV format."""
@@ -51,6 +94,75 @@ def convert_quarterly_to_iso(date_str: str) -> str:
     return date_str
 
 
+def series_prefix(series_code: str) -> str:
+    """Partition value for a series: its first two characters, uppercased."""
+    prefix = "".join(c if c.isalnum() else "_" for c in series_code[:2].upper())
+    return prefix or "_"
+
+
+def infer_frequency(dates: list[date]) -> str:
+    """Frequency label from the median gap between sorted observation dates."""
+    if len(dates) < 2:
+        return "irregular"
+    gap = statistics.median((b - a).days for a, b in zip(dates, dates[1:]))
+    for label, max_days in (("daily", 4), ("weekly", 10), ("monthly", 45),
+                            ("quarterly", 120), ("annual", 400)):
+        if gap <= max_days:
+            return label
+    return "irregular"
+
+
+def parse_observation_date(date_str: str) -> date | None:
+    """Observation date (quarters as their first day), or None if unparseable."""
+    try:
+        return date.fromisoformat(convert_quarterly_to_iso(date_str))
+    except (TypeError, ValueError):
+        return None
+
+
+def observation_rows(series_code: str, observations: list[dict], frequency: str | None) -> tuple[list[dict], str]:
+    """Long-format rows for a series' observations.
+
+    `frequency` is the series' recorded frequency; when None (first time
+    the series is written) it is inferred from these observations.
+    Returns (rows, frequency).
+    """
+    # Last observation wins when two dates land on the same day
+    values = {}
+    for obs in observations:
+        day = parse_observation_date(obs.get("date"))
+        if day is None:
+            continue
+        try:
+            values[day] = float(obs.get("value"))
+        except (TypeError, ValueError):
+            values[day] = None
+    parsed = sorted(values.items())
+
+    if frequency is None:
+        frequency = infer_frequency([day for day, _ in parsed])
+    prefix = series_prefix(series_code)
+    rows = [
+        {"series_id": series_code, "date": day, "value": value,
+         "frequency": frequency, "series_prefix": prefix}
+        for day, value in parsed
+    ]
+    return rows, frequency
+
+
+def write_observations(rows: list[dict]) -> None:
+    """Merge buffered rows into the observations table and publish it."""
+    if not rows:
+        return
+    table = pa.Table.from_pylist(rows, schema=OBSERVATIONS_SCHEMA)
+    merge(
+        table, OBSERVATIONS_TABLE, key=OBSERVATIONS_KEY,
+        partition_by=OBSERVATIONS_PARTITIONS, profile=OBSERVATIONS_PROFILE,
+        metadata=OBSERVATIONS_METADATA,
+    )
+    publish(OBSERVATIONS_TABLE, OBSERVATIONS_METADATA)
+
+
 def fetch_series_observations(series_code: str, start_date: str) -> list | None:
     """Fetch observations for a series with retry logic. Returns None if the series is inaccessible."""
     url = f"https://www.bankofcanada.ca/valet/observations/{series_code}/csv"
@@ -127,10 +239,78 @@ def run() -> bool:
     series_list = parse_series_csv(csv_text)
     print(f"  {len(series_list)} series in catalog")
 
-    # Load state
-    state = load_state("series_data")
-    series_states = state.get("series_states", {})
-    fetched_series = set(state.get("fetched_series", []))
+    with state("series_data") as progress:
+        return _fetch_all(series_list, progress, start_time)
+
+
+def _fetch_all(series_list: list[dict], progress, start_time: float) -> bool:
+    """Fetch loop of run(), checkpointing into the `progress` state handle."""
+    series_states = progress.get("series_states", {})
+    fetched_series = set(progress.get("fetched_series", []))
+    # Series in the observations table -> frequency. Entries move here from
+    # `pending` only once their rows are merged, so a crash re-sends them.
+    observed = dict(progress.get("observations", {}))
+    pending = {}
+    # New last_date per series, committed with its rows: series_states is
+    # the observations table's watermark, so a crash before the merge
+    # re-sends everything after it
+    pending_states = {}
+    buffer = []
+    # Progress keys changed since the last checkpoint
+    changed = set()
+
+    def save_progress():
+        # Only changed keys are marked, so flush() encodes just those
+        if "series_states" in changed:
+            progress["series_states"] = series_states
+        if "fetched_series" in changed:
+            progress["fetched_series"] = sorted(fetched_series)
+        if "observations" in changed:
+            progress["observations"] = observed
+        changed.clear()
+        progress.flush()
+
+    def mark_fetched(series_code):
+        if series_code not in fetched_series:
+            fetched_series.add(series_code)
+            changed.add("fetched_series")
+
+    def flush_observations():
+        write_observations(buffer)
+        buffer.clear()
+        if pending:
+            observed.update(pending)
+            pending.clear()
+            changed.add("observations")
+        for series_code, last_date in pending_states.items():
+            series_states[series_code] = {"last_date": last_date}
+            changed.add("series_states")
+        pending_states.clear()
+        save_progress()
+
+    def buffer_observations(series_code, all_obs):
+        # Backfill the full history the first time a series is seen here;
+        # afterwards everything after its committed last_date, which also
+        # covers rows fetched by a run that crashed before merging them.
+        committed = series_states.get(series_code, {}).get("last_date")
+        if series_code in observed or series_code in pending:
+            frequency = observed.get(series_code) or pending[series_code]
+            source = [
+                obs for obs in all_obs
+                if obs["date"] and '-' in obs["date"] and (committed is None or obs["date"] > committed)
+            ]
+        else:
+            frequency = None
+            source = all_obs
+        latest = max((obs["date"] for obs in source if obs["date"] and '-' in obs["date"]), default=None)
+        if latest is not None and (committed is None or latest > committed):
+            pending_states[series_code] = latest
+        if not source:
+            return
+        rows, pending[series_code] = observation_rows(series_code, source, frequency)
+        buffer.extend(rows)
+        if len(buffer) >= OBSERVATIONS_FLUSH_ROWS:
+            flush_observations()
 
     updated_count = 0
     skipped_count = 0
@@ -140,6 +320,7 @@ def run() -> bool:
         # Time budget check before each series
         if time.time() - start_time >= GH_ACTIONS_MAX_RUN_SECONDS:
             print(f"  Time budget exhausted")
+            flush_observations()
             return True
 
         series_code = series['name']
@@ -175,7 +356,8 @@ def run() -> bool:
         if not new_obs:
             skipped_count += 1
             # Still mark as fetched even if no new data
-            fetched_series.add(series_code)
+            mark_fetched(series_code)
+            buffer_observations(series_code, existing_obs)
             continue
 
         # Add metadata to new observations
@@ -190,29 +372,24 @@ def run() -> bool:
 
         if not new_unique:
             skipped_count += 1
-            fetched_series.add(series_code)
+            mark_fetched(series_code)
+            buffer_observations(series_code, existing_obs)
             continue
 
         # Save observations (to R2 in cloud mode)
         save_series_data(series_code, all_obs)
 
-        # Update state with new last_date
-        valid_new_dates = [obs["date"] for obs in new_obs if obs["date"] and '-' in obs["date"]]
-        if valid_new_dates:
-            new_last_date = max(valid_new_dates)
-            series_states[series_code] = {"last_date": new_last_date}
-
-        # Track that this series has been fetched
-        fetched_series.add(series_code)
+        # Track that this series has been fetched; its new last_date is
+        # staged with the buffered rows
+        mark_fetched(series_code)
+        buffer_observations(series_code, all_obs)
 
         # Save state after each series for resumability
-        save_state("series_data", {
-            "series_states": series_states,
-            "fetched_series": sorted(fetched_series)
-        })
+        save_progress()
 
         updated_count += 1
 
+    flush_observations()
     print(f"  Updated {updated_count} series, {skipped_count} up to date, {inaccessible_count} inaccessible")
     return False
 
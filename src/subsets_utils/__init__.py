@@ -1,13 +1,18 @@
 from .http_client import get, post, put, delete, get_client, configure_http
 from .io import (
-    load_state, save_state, load_asset,
+    load_state, save_state, state, StateHandle, load_asset, load_asset_batches, load_changes,
     save_raw_json, load_raw_json,
-    save_raw_file, load_raw_file,
-    save_raw_parquet, load_raw_parquet, raw_parquet_localpath,
+    save_raw_ndjson, load_raw_ndjson, iter_raw_ndjson,
+    load_raw_many, save_raw_many,
+    save_raw_file, load_raw_file, train_raw_dictionary,
+    save_raw_parquet, load_raw_parquet, raw_parquet_localpath, raw_parquet_file,
+    save_raw_arrow, load_raw_arrow,
     list_raw_files, delete_raw_file, data_hash, raw_parquet_hash, raw_asset_exists,
-    raw_writer, raw_reader, raw_parquet_writer,
+    raw_writer, raw_reader, raw_parquet_writer, raw_ndjson_writer,
+    flush_io,
 )
-from .delta import merge, overwrite, append, validate_asset, WriteResult
+from .delta import merge, overwrite, append, validate_asset, WriteResult, WriterPool, log_health, table_stats, table_schema, invalidate_table
+from .profiles import WriteProfile, set_write_profile
 from .orchestrator import DAG, load_nodes
 from . import duckdb
 from .config import validate_environment, get_data_dir, is_cloud, get_fs
@@ -21,16 +26,22 @@ __all__ = [
     'get', 'post', 'put', 'delete', 'get_client', 'configure_http',
     # Delta writes
     'merge', 'overwrite', 'append', 'validate_asset', 'WriteResult',
+    'WriterPool', 'log_health', 'table_stats', 'table_schema', 'invalidate_table',
+    'WriteProfile', 'set_write_profile',
     # Publishing
     'publish',
     # State & raw I/O
-    'load_state', 'save_state', 'load_asset', 'data_hash', 'raw_parquet_hash',
-    'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
-    'save_raw_parquet', 'load_raw_parquet', 'raw_parquet_localpath',
+    'load_state', 'save_state', 'state', 'StateHandle', 'load_asset', 'load_asset_batches', 'load_changes', 'data_hash', 'raw_parquet_hash',
+    'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file', 'train_raw_dictionary',
+    'save_raw_ndjson', 'load_raw_ndjson', 'iter_raw_ndjson',
+    'load_raw_many', 'save_raw_many',
+    'save_raw_parquet', 'load_raw_parquet', 'raw_parquet_localpath', 'raw_parquet_file',
+    'save_raw_arrow', 'load_raw_arrow',
     'list_raw_files', 'delete_raw_file',
     'raw_asset_exists',
     # Streaming I/O
-    'raw_writer', 'raw_reader', 'raw_parquet_writer',
+    'raw_writer', 'raw_reader', 'raw_parquet_writer', 'raw_ndjson_writer',
+    'flush_io',
     # Config
     'validate_environment', 'get_data_dir', 'is_cloud', 'get_fs',
     # Other
@@ -0,0 +1,202 @@
+"""Local read-through disk cache for remote (s3://) raw and state objects.
+
+In cloud mode every raw/state read is a GET against R2, and continuation
+invocations or repeated runs on the same runner fetch the same objects
+again. The cache keeps a copy of each object read or written under a
+local directory:
+
+- Reads validate the entry with one metadata request (HEAD) against the
+  object's ETag, or size + mtime where the store has no ETag, and only
+  download on a miss or a stale entry.
+- Writes go through: the bytes just uploaded are cached under the new
+  object's validator, so reading back your own write is a hit.
+- Total size is capped; least recently used entries are evicted first
+  (recency is the entry file's mtime, bumped on every hit).
+
+Off by default in cloud mode: CI runners start with an empty disk, so
+every read would miss and pay the HEAD on top of the GET. Runners with a
+persistent cache directory can opt in with SUBSETS_CACHE=1.
+
+Counters (node "metrics" in run.json):
+    cache.hits, cache.misses: reads served locally / downloaded
+    cache.hit_bytes: bytes served locally
+
+Config (env vars):
+    SUBSETS_CACHE: "1" enables, "0" disables (default on locally, off
+        in cloud mode)
+    SUBSETS_CACHE_DIR: cache directory (default ~/.cache/subsets)
+    SUBSETS_CACHE_MAX_BYTES: size cap (default 5 GB)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from .config import is_cloud
+from .tracking import record_metric
+
+
+def _validator(info: dict) -> str:
+    """Version token for an object: its ETag, else size + mtime."""
+    etag = info.get("ETag") or info.get("etag")
+    if etag:
+        return f"etag:{etag.strip(chr(34))}"
+    mtime = info.get("LastModified") or info.get("mtime") or info.get("created")
+    return f"size:{info.get('size')}:mtime:{mtime}"
+
+
+class DiskCache:
+    """Content-validated LRU cache of remote objects on local disk."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def _entry(self, uri: str) -> tuple[Path, Path]:
+        digest = hashlib.sha1(uri.encode()).hexdigest()
+        base = self.root / digest[:2] / digest
+        return base.with_suffix(".bin"), base.with_suffix(".json")
+
+    def _valid(self, uri: str, info: dict) -> Path | None:
+        """Entry data path if cached under the object's current validator."""
+        data_path, meta_path = self._entry(uri)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get("uri") != uri or meta.get("validator") != _validator(info) or not data_path.exists():
+            return None
+        return data_path
+
+    def _lookup(self, uri: str, fs) -> tuple[dict | None, Path | None]:
+        """(object info, valid entry path or None). info is None if the
+        object doesn't exist (and any entry for it is dropped)."""
+        try:
+            info = fs.info(uri, refresh=True)
+        except FileNotFoundError:
+            self.discard(uri)
+            return None, None
+        path = self._valid(uri, info)
+        if path is not None:
+            os.utime(path)
+            record_metric("cache.hits")
+            record_metric("cache.hit_bytes", path.stat().st_size)
+        else:
+            record_metric("cache.misses")
+        return info, path
+
+    def _store(self, uri: str, info: dict, write) -> Path:
+        """Write an entry via write(tmp_path), atomically replacing any old one."""
+        data_path, meta_path = self._entry(uri)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = data_path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+        write(tmp)
+        old = data_path.stat().st_size if data_path.exists() else 0
+        os.replace(tmp, data_path)
+        meta_path.write_text(json.dumps({"uri": uri, "validator": _validator(info)}))
+        self._added(data_path.stat().st_size - old)
+        return data_path
+
+    def read(self, uri: str, fs) -> bytes | None:
+        """Object bytes, from the cache when valid. None if it doesn't exist."""
+        info, path = self._lookup(uri, fs)
+        if info is None:
+            return None
+        if path is not None:
+            return path.read_bytes()
+        data = fs.cat_file(uri)
+        self._store(uri, info, lambda tmp: tmp.write_bytes(data))
+        return data
+
+    def path(self, uri: str, fs) -> str | None:
+        """Local path holding the object, downloading it on a miss. None
+        if it doesn't exist. The path is only valid until evicted."""
+        info, path = self._lookup(uri, fs)
+        if info is None:
+            return None
+        if path is None:
+            path = self._store(uri, info, lambda tmp: fs.get_file(uri, str(tmp)))
+        return str(path)
+
+    def peek(self, uri: str, fs) -> str | None:
+        """Local path of a current entry for `uri`, without downloading on
+        a miss. None if not cached (or stale, or the object is gone)."""
+        info, path = self._lookup(uri, fs)
+        return str(path) if path is not None else None
+
+    def put(self, uri: str, fs, data: bytes) -> None:
+        """Write-through: cache bytes just written to `uri`."""
+        try:
+            info = fs.info(uri, refresh=True)
+        except FileNotFoundError:
+            return
+        self._store(uri, info, lambda tmp: tmp.write_bytes(data))
+
+    def discard(self, uri: str) -> None:
+        data_path, meta_path = self._entry(uri)
+        size = data_path.stat().st_size if data_path.exists() else 0
+        for p in (data_path, meta_path):
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+        if size:
+            self._added(-size)
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for p in self.root.glob("*/*.bin"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def _added(self, nbytes: int) -> None:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._scan())
+            else:
+                self._total += nbytes
+            if self._total <= self.max_bytes:
+                return
+            # Evict least recently used down to 90% of the cap
+            entries = sorted(self._scan())
+            self._total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            for _, size, p in entries:
+                if self._total <= target:
+                    break
+                for victim in (p, p.with_suffix(".json")):
+                    try:
+                        victim.unlink()
+                    except FileNotFoundError:
+                        pass
+                self._total -= size
+
+
+_cache: DiskCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> DiskCache | None:
+    """The process-wide disk cache, or None if disabled."""
+    global _cache
+    if os.environ.get("SUBSETS_CACHE", "0" if is_cloud() else "1") == "0":
+        return None
+    root = os.environ.get("SUBSETS_CACHE_DIR") or str(Path.home() / ".cache" / "subsets")
+    max_bytes = int(os.environ.get("SUBSETS_CACHE_MAX_BYTES", 5 * 1024**3))
+    with _cache_lock:
+        if _cache is None or str(_cache.root) != root or _cache.max_bytes != max_bytes:
+            _cache = DiskCache(root, max_bytes)
+        return _cache
+
+
+def cache_for(uri: str) -> DiskCache | None:
+    """The cache if `uri` is remote and caching is on, else None."""
+    return get_cache() if uri.startswith("s3://") else None
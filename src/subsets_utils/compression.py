@@ -0,0 +1,234 @@
+"""Compression codecs for raw assets, detected from magic bytes.
+
+Writers pick a codec explicitly (save_raw_file(..., codec="zstd", level=9));
+readers never need to be told: the first bytes of a stream identify it.
+
+    gzip  1f 8b
+    zstd  28 b5 2f fd
+
+Plain text formats (CSV, JSON, XML) can't start with either sequence, so
+sniffing is safe for them; binary payloads that happen to be gzip (a
+downloaded .gz) are decompressed too unless the reader opts out.
+
+zstd goes through the `zstandard` package when it is installed (any
+level, streaming, dictionaries) and through pyarrow's bundled zstd
+otherwise (one-shot at any level, streams at the default level, no
+dictionaries).
+
+Dictionaries: thousands of small, similar files (per-series CSV/JSON)
+compress poorly one by one, because every file starts from an empty
+window. A zstd dictionary trained on samples of them primes the window
+with their shared structure. The dictionary ID is stored in each frame
+header, so readers find the right dictionary without being told;
+resolving IDs to dictionary bytes is the caller's job (see io.py).
+
+Config (env vars):
+    RAW_ZSTD_LEVEL: default zstd level when none is given (default 3)
+    RAW_GZIP_LEVEL: default gzip level when none is given (default 6)
+"""
+
+import gzip
+import io
+import os
+from typing import Callable
+
+import pyarrow as pa
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional
+    zstandard = None
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+CODECS = ("gzip", "zstd")
+SUFFIXES = {"gzip": "gz", "zstd": "zst"}
+
+# Resolves a zstd dictionary ID to the dictionary's bytes
+DictionaryLookup = Callable[[int], bytes]
+
+
+def _default_level(codec: str) -> int:
+    if codec == "zstd":
+        return int(os.environ.get("RAW_ZSTD_LEVEL", 3))
+    return int(os.environ.get("RAW_GZIP_LEVEL", 6))
+
+
+def _check_codec(codec: str) -> None:
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}; expected one of {CODECS}")
+
+
+def _require_zstandard(what: str) -> None:
+    if zstandard is None:
+        raise ImportError(f"{what} needs the 'zstandard' package (pip install zstandard)")
+
+
+def detect_codec(head: bytes) -> str | None:
+    """Codec of a payload from its first bytes, or None if uncompressed."""
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def dictionary_id(head: bytes) -> int:
+    """Dictionary ID in a zstd frame header (0 if none)."""
+    if zstandard is not None:
+        return zstandard.get_frame_parameters(head).dict_id
+    # Frame_Header_Descriptor: low two bits give the Dictionary_ID size,
+    # which follows the Window_Descriptor (absent for single-segment frames)
+    descriptor = head[4]
+    size = (0, 1, 2, 4)[descriptor & 0x3]
+    start = 5 if descriptor & 0x20 else 6
+    return int.from_bytes(head[start:start + size], "little") if size else 0
+
+
+# =============================================================================
+# One-shot
+# =============================================================================
+
+def compress(data: bytes, codec: str, level: int | None = None, dictionary: bytes | None = None) -> bytes:
+    """Compress bytes. `dictionary` (zstd only) is a trained dictionary."""
+    _check_codec(codec)
+    level = _default_level(codec) if level is None else level
+    if codec == "gzip":
+        if dictionary is not None:
+            raise ValueError("Dictionaries are only supported with codec='zstd'")
+        # mtime=0: identical input gives identical bytes (stable hashes)
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if zstandard is not None:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary is not None else None
+        return zstandard.ZstdCompressor(level=level, dict_data=dict_data).compress(data)
+    if dictionary is not None:
+        _require_zstandard("zstd dictionary compression")
+    return pa.Codec("zstd", compression_level=level).compress(data, asbytes=True)
+
+
+def decompress(data: bytes, dictionaries: DictionaryLookup | None = None) -> bytes:
+    """Decompress bytes by their magic. Uncompressed input is returned as is."""
+    codec = detect_codec(data[:4])
+    if codec is None:
+        return data
+    if codec == "gzip":
+        return gzip.decompress(data)
+    dict_id = dictionary_id(data[:18])
+    if zstandard is not None:
+        dict_data = _dictionary(dict_id, dictionaries)
+        # stream_reader: frames written by streams may not record their size
+        with zstandard.ZstdDecompressor(dict_data=dict_data).stream_reader(
+            io.BytesIO(data), read_across_frames=True
+        ) as reader:
+            return reader.read()
+    if dict_id:
+        _require_zstandard("Reading a dictionary-compressed zstd asset")
+    return pa.CompressedInputStream(pa.BufferReader(data), "zstd").read()
+
+
+def _dictionary(dict_id: int, dictionaries: DictionaryLookup | None):
+    if not dict_id:
+        return None
+    if dictionaries is None:
+        raise ValueError(f"zstd frame uses dictionary {dict_id} but no dictionary lookup was given")
+    return zstandard.ZstdCompressionDict(dictionaries(dict_id))
+
+
+def train_dictionary(samples: list[bytes], size: int = 112_640) -> tuple[int, bytes]:
+    """Train a zstd dictionary on sample payloads. Returns (dict_id, bytes).
+
+    A few hundred samples of the files it will compress is typical;
+    112 KB is zstd's default dictionary size.
+    """
+    _require_zstandard("Training a zstd dictionary")
+    trained = zstandard.train_dictionary(size, samples)
+    return trained.dict_id(), trained.as_bytes()
+
+
+# =============================================================================
+# Streams
+#
+# Both wrappers return binary file objects; the caller closes them before
+# the underlying file and adds a TextIOWrapper for text mode. Closing a
+# wrapper leaves the underlying file open.
+# =============================================================================
+
+class _NativeFileAdapter(io.RawIOBase):
+    """A pyarrow compressed stream as a Python raw file, so it can be
+    buffered, line-iterated and text-wrapped."""
+
+    def __init__(self, stream, writable: bool):
+        self._stream = stream
+        self._writable = writable
+
+    def readable(self) -> bool:
+        return not self._writable
+
+    def writable(self) -> bool:
+        return self._writable
+
+    def readinto(self, b) -> int:
+        data = self._stream.read(len(b))
+        b[:len(data)] = data
+        return len(data)
+
+    def write(self, b) -> int:
+        self._stream.write(b)
+        return len(b)
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stream.close()
+        super().close()
+
+
+class _KeepOpen(io.RawIOBase):
+    """Writable view of a file whose close() doesn't close the file."""
+
+    def __init__(self, f):
+        self._f = f
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        return self._f.write(b)
+
+
+def compressing_writer(f, codec: str, level: int | None = None, dictionary: bytes | None = None):
+    """Binary writer compressing into the open binary file `f`."""
+    _check_codec(codec)
+    level = _default_level(codec) if level is None else level
+    if codec == "gzip":
+        if dictionary is not None:
+            raise ValueError("Dictionaries are only supported with codec='zstd'")
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=level, mtime=0)
+    if zstandard is not None:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary is not None else None
+        cctx = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        return cctx.stream_writer(f, closefd=False)
+    if dictionary is not None:
+        _require_zstandard("zstd dictionary compression")
+    # pyarrow's stream has no level knob; it writes at zstd's default
+    stream = pa.CompressedOutputStream(pa.PythonFile(_KeepOpen(f), mode="w"), "zstd")
+    return io.BufferedWriter(_NativeFileAdapter(stream, writable=True))
+
+
+def decompressing_reader(f, dictionaries: DictionaryLookup | None = None):
+    """Binary reader over the open, seekable binary file `f`, decompressing
+    by magic. Uncompressed files come back as `f` itself."""
+    head = f.read(18)
+    f.seek(0)
+    codec = detect_codec(head)
+    if codec is None:
+        return f
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=f, mode="rb")
+    if zstandard is not None:
+        dctx = zstandard.ZstdDecompressor(dict_data=_dictionary(dictionary_id(head), dictionaries))
+        return io.BufferedReader(dctx.stream_reader(f, read_across_frames=True, closefd=False))
+    if dictionary_id(head):
+        _require_zstandard("Reading a dictionary-compressed zstd asset")
+    stream = pa.CompressedInputStream(pa.PythonFile(f, mode="r"), "zstd")
+    return io.BufferedReader(_NativeFileAdapter(stream, writable=False))
@@ -178,6 +178,35 @@ def get_fs(uri: str = ""):
     return fsspec.filesystem("file", auto_mkdir=True)
 
 
+def get_arrow_fs(uri: str):
+    """Native pyarrow filesystem for a URI, plus the path to pass it.
+
+    Arrow's own S3 client reads straight into Arrow buffers (ranged,
+    parallel GETs), without fsspec's Python-level copies. Falls back to
+    wrapping the fsspec filesystem when pyarrow was built without S3.
+
+    Local files open memory-mapped, so Arrow IPC reads are zero-copy.
+
+    Returns:
+        (pyarrow.fs.FileSystem, path) — the path has no scheme.
+    """
+    from pyarrow import fs as pafs
+    if not uri.startswith("s3://"):
+        # use_mmap: input files are memory-mapped rather than read
+        return pafs.LocalFileSystem(use_mmap=True), uri
+    path = uri[len("s3://"):]
+    try:
+        s3 = pafs.S3FileSystem(
+            endpoint_override=f"https://{os.environ['R2_ACCOUNT_ID']}.r2.cloudflarestorage.com",
+            access_key=os.environ["R2_ACCESS_KEY_ID"],
+            secret_key=os.environ["R2_SECRET_ACCESS_KEY"],
+            region="auto",
+        )
+    except (AttributeError, ImportError, NotImplementedError):
+        s3 = pafs.PyFileSystem(pafs.FSSpecHandler(get_fs(uri)))
+    return s3, path
+
+
 # =============================================================================
 # Path / URI Builders
 #
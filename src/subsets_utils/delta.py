@@ -4,11 +4,20 @@ Simple, explicit API for writing to Delta tables.
 No hidden defaults. No escape hatches.
 """
 
+import contextvars
+import json
+import math
 import os
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import date, datetime, timezone
 from pathlib import Path
 from typing import Union
 import pyarrow as pa
+import pyarrow.compute as pc
 from deltalake import write_deltalake, DeltaTable, CommitProperties
 try:
     from deltalake.exceptions import TableNotFoundError
@@ -17,11 +26,18 @@ except ImportError:
         from deltalake import TableNotFoundError  # older deltalake
     except ImportError:
         TableNotFoundError = None  # fallback: we'll handle by exception type name
+try:
+    from deltalake.exceptions import CommitFailedError
+except ImportError:
+    CommitFailedError = None  # fallback: matched by message in _is_commit_conflict
 
-from .config import get_data_dir, is_cloud, get_storage_options, subsets_uri
+from .config import get_data_dir, is_cloud, get_storage_options, subsets_uri, get_fs
 from . import debug
-from .io import data_hash
-from .tracking import record_write
+from .io import data_hash, hashing_reader, state
+from .keycheck import KeyValidator, validate_keys, validating_reader
+from .maintenance import carry_tombstones, file_layout, live_files, maybe_maintain
+from .profiles import WriteProfile, resolve_profile, sort_source
+from .tracking import record_write, record_metric, annotate_asset
 
 
 def _is_table_not_found(exc: Exception) -> bool:
@@ -76,48 +92,64 @@ def validate_asset(
     name: str,
     *,
     key: Union[str, list[str]] = None,
-    expected_columns: list[str] = None
+    expected_columns: list[str] = None,
+    sample: float | None = None
 ) -> dict:
-    """Validate an existing Delta table asset.
+    """Validate an existing Delta table asset without loading it.
+
+    Row and null counts come from the Delta log's per-file statistics.
+    Key uniqueness streams only the key columns through a hash
+    aggregation (keycheck.KeyValidator), so memory is bounded by the
+    number of keys, not the table width.
 
     Returns a report with:
     - row_count: number of rows
     - columns: list of columns
     - key_duplicates: number of duplicate key combinations (if key provided)
     - key_nulls: nulls per key column (if key provided)
+    - sampled: fraction of keys checked (if sample provided)
     - needs_cleanup: True if issues found
 
     Args:
         name: Dataset name
         key: Expected key column(s) for uniqueness check
         expected_columns: Columns that should exist
+        sample: Check uniqueness for only this fraction of distinct keys
+            (chosen by key hash, so every copy of a sampled key is seen).
+            key_duplicates is then an estimate scaled up from the sample.
 
     Returns:
         Validation report dict
 
     Raises:
         FileNotFoundError: If asset doesn't exist
+        ValueError: If sample is outside (0, 1]
     """
+    if sample is not None and not 0 < sample <= 1:
+        raise ValueError(f"sample must be in (0, 1], got {sample}")
     uri = _get_uri(name)
     opts = _get_opts()
 
     try:
-        dt = DeltaTable(uri, storage_options=opts)
-        table = dt.to_pyarrow_table()
+        dt = _open_table(uri, opts)
     except Exception as e:
         raise FileNotFoundError(f"Asset '{name}' not found: {e}")
 
+    columns = [f.name for f in pa.schema(dt.schema())]
+    adds = _add_actions(dt)
+    row_count = _sum_column(adds, "num_records")
+
     report = {
         "name": name,
-        "row_count": len(table),
-        "columns": table.column_names,
+        "row_count": row_count,
+        "columns": columns,
         "issues": [],
         "needs_cleanup": False
     }
 
     # Check expected columns
     if expected_columns:
-        missing = set(expected_columns) - set(table.column_names)
+        missing = set(expected_columns) - set(columns)
         if missing:
             report["issues"].append(f"Missing columns: {missing}")
             report["needs_cleanup"] = True
@@ -128,15 +160,32 @@ def validate_asset(
         report["key"] = keys
 
         # Check key columns exist
-        missing_keys = [k for k in keys if k not in table.column_names]
+        missing_keys = [k for k in keys if k not in columns]
         if missing_keys:
             report["issues"].append(f"Key columns missing: {missing_keys}")
             report["needs_cleanup"] = True
         else:
-            # Check nulls in key columns
+            # Null counts from file stats; columns without complete stats
+            # are counted during the key scan below.
+            stats_nulls = {k: _sum_column(adds, f"null_count.{k}", complete=True) for k in keys}
+            scanned_nulls = {k: 0 for k in keys}
+
+            checker = KeyValidator(keys, name, sample=sample)
+            for batch in dt.to_pyarrow_dataset().to_batches(columns=keys):
+                valid = None
+                for k in keys:
+                    scanned_nulls[k] += batch.column(k).null_count
+                    is_valid = pc.is_valid(batch.column(k))
+                    valid = is_valid if valid is None else pc.and_(valid, is_valid)
+                checker.update(batch.filter(valid))
+            dup_count = checker.duplicates()
+            if sample is not None:
+                report["sampled"] = sample
+                dup_count = round(dup_count / sample)
+
             key_nulls = {}
             for k in keys:
-                null_count = table[k].null_count
+                null_count = stats_nulls[k] if stats_nulls[k] >= 0 else scanned_nulls[k]
                 if null_count > 0:
                     key_nulls[k] = null_count
             if key_nulls:
@@ -144,28 +193,17 @@ def validate_asset(
                 report["issues"].append(f"Nulls in key columns: {key_nulls}")
                 report["needs_cleanup"] = True
 
-            # Check duplicates
-            import pyarrow.compute as pc
-            if len(keys) == 1:
-                unique_count = len(table[keys[0]].unique())
-            else:
-                combined = pc.binary_join_element_wise(
-                    *[pc.cast(table[k], pa.string()) for k in keys],
-                    "||"
-                )
-                unique_count = len(combined.unique())
-
-            dup_count = len(table) - unique_count
             if dup_count > 0:
                 report["key_duplicates"] = dup_count
-                report["issues"].append(f"{dup_count} duplicate key combinations")
+                approx = "~" if sample is not None else ""
+                report["issues"].append(f"{approx}{dup_count} duplicate key combinations")
                 report["needs_cleanup"] = True
 
     # Summary
     if report["needs_cleanup"]:
         print(f"⚠️  [{name}] Needs cleanup: {', '.join(report['issues'])}")
     else:
-        print(f"✅ [{name}] Valid: {len(table):,} rows, key={key}")
+        print(f"✅ [{name}] Valid: {row_count:,} rows, key={key}")
 
     return report
 
@@ -182,6 +220,271 @@ def _get_opts() -> dict | None:
     return get_storage_options() if is_cloud() else None
 
 
+# =============================================================================
+# Table handle cache
+#
+# Opening a DeltaTable replays its transaction log from storage. A single
+# node run touches the same table several times (merge probe, post-write
+# stats, publish, load_asset, validate_asset), so handles are cached per
+# process, keyed by URI. Reuse refreshes with update_incremental(), which
+# only reads commits newer than the handle's version. Writes that go
+# through a cached handle (dt.merge, dt.alter, write_deltalake(dt, ...))
+# advance it in place; anything else must call invalidate_table().
+# =============================================================================
+
+_tables: dict[str, DeltaTable] = {}
+_tables_lock = threading.Lock()
+
+
+def _open_table(uri: str, opts: dict | None) -> DeltaTable:
+    """Return a cached handle for `uri`, refreshed to the latest version.
+
+    Raises whatever deltalake raises when the table doesn't exist — use
+    _is_table_not_found() to tell that apart. Failed opens are not cached.
+    """
+    with _tables_lock:
+        dt = _tables.get(uri)
+    if dt is not None:
+        try:
+            dt.update_incremental()
+            return dt
+        except Exception:
+            # Table deleted/recreated or log cleaned up under us — reopen.
+            _invalidate_uri(uri)
+    dt = DeltaTable(uri, storage_options=opts)
+    with _tables_lock:
+        _tables[uri] = dt
+    return dt
+
+
+def _cached_table(uri: str) -> DeltaTable | None:
+    """The cached handle for `uri` without refreshing, or None."""
+    with _tables_lock:
+        return _tables.get(uri)
+
+
+def _invalidate_uri(uri: str) -> None:
+    with _tables_lock:
+        _tables.pop(uri, None)
+        _stats_cache.pop(uri, None)
+
+
+def invalidate_table(name: str | None = None) -> None:
+    """Drop the cached handle for a dataset (all datasets if name is None).
+
+    Call after writing to a table by any path that bypasses this module,
+    e.g. a raw write_deltalake(uri, ...) from connector code.
+    """
+    if name is None:
+        with _tables_lock:
+            _tables.clear()
+            _stats_cache.clear()
+        return
+    _invalidate_uri(_get_uri(name))
+
+
+# =============================================================================
+# Transaction log health & checkpointing
+#
+# Every merge/overwrite/append/publish is a JSON commit. Opening a table
+# reads the latest checkpoint plus every commit after it, so open time
+# grows with commits-since-checkpoint, not table age — as long as
+# checkpoints keep up. deltalake only checkpoints every 100 commits by
+# default; we checkpoint on our own cadence after writes and then drop
+# log files past the table's delta.logRetentionDuration (30 days default).
+#
+# The same cadence paces the storage listings behind the post-write
+# stats: writes in between read only `_last_checkpoint` and the new
+# commit files, so their cost doesn't grow with the table.
+#
+# DELTA_CHECKPOINT_INTERVAL: commits between checkpoints (default 10,
+# 0 disables checkpoints and post-write listings).
+# =============================================================================
+
+def _env_number(var: str, default, cast=int):
+    """os.environ[var] parsed with `cast`; a malformed value falls back to
+    `default` with a warning instead of failing the write."""
+    raw = os.environ.get(var)
+    if raw is None:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        print(f"⚠️  {var}={raw!r} is not a valid {cast.__name__}; using {default}")
+        return default
+
+
+def _checkpoint_interval() -> int:
+    return max(0, _env_number("DELTA_CHECKPOINT_INTERVAL", 10))
+
+
+def _log_health(dt: DeltaTable, uri: str, *, list_log: bool = True) -> dict:
+    """Log length and checkpoint age for an open table.
+
+    Reads `_delta_log/_last_checkpoint`. With list_log, also stats it and
+    lists `_delta_log/` once; without, checkpoint_age_s and log_files
+    are None.
+    """
+    log_uri = f"{uri.rstrip('/')}/_delta_log"
+    fs = get_fs(log_uri)
+    version = dt.version()
+
+    checkpoint_version = None
+    checkpoint_age_s = None
+    try:
+        with fs.open(f"{log_uri}/_last_checkpoint", "rb") as f:
+            checkpoint_version = int(json.loads(f.read())["version"])
+    except FileNotFoundError:
+        pass
+    if list_log and checkpoint_version is not None:
+        try:
+            info = fs.info(f"{log_uri}/_last_checkpoint")
+            mtime = info.get("LastModified") or info.get("mtime")
+            if isinstance(mtime, (int, float)):
+                mtime = datetime.fromtimestamp(mtime, tz=timezone.utc)
+            if mtime is not None:
+                if mtime.tzinfo is None:
+                    mtime = mtime.replace(tzinfo=timezone.utc)
+                checkpoint_age_s = round((datetime.now(timezone.utc) - mtime).total_seconds())
+        except FileNotFoundError:
+            pass
+
+    log_files = None
+    if list_log:
+        try:
+            log_files = sum(1 for p in fs.ls(log_uri, detail=False) if p.endswith(".json"))
+        except FileNotFoundError:
+            log_files = 0
+
+    since = version - checkpoint_version if checkpoint_version is not None else version + 1
+    return {
+        "version": version,
+        "checkpoint_version": checkpoint_version,
+        "commits_since_checkpoint": since,
+        "checkpoint_age_s": checkpoint_age_s,
+        "log_files": log_files,
+    }
+
+
+def _checkpoint_due(health: dict) -> bool:
+    interval = _checkpoint_interval()
+    return bool(interval) and health["commits_since_checkpoint"] >= interval
+
+
+def _maybe_checkpoint(dt: DeltaTable, uri: str, name: str, health: dict) -> dict | None:
+    """Checkpoint + clean up expired logs when the cadence is due.
+
+    `health` is the write's _log_health(list_log=False). Returns the log
+    health after any checkpoint, complete (listed) only when one ran, or
+    None if it couldn't be read. Never fails the write.
+    """
+    try:
+        if _checkpoint_due(health):
+            dt.create_checkpoint()
+            dt.cleanup_metadata()
+            print(f"[checkpoint] {name}: v{health['version']} ({health['commits_since_checkpoint']} commits since last)")
+            return _log_health(dt, uri)
+    except Exception as e:
+        print(f"⚠️  [checkpoint] {name}: skipped ({e})")
+        return None
+    # Maintenance may have committed since `health` was read
+    version, checkpoint_version = dt.version(), health["checkpoint_version"]
+    return {
+        **health,
+        "version": version,
+        "commits_since_checkpoint": version - checkpoint_version if checkpoint_version is not None else version + 1,
+    }
+
+
+def log_health(name: str) -> dict:
+    """Transaction log health for a published table.
+
+    Returns:
+        version: current table version
+        checkpoint_version: version of the latest checkpoint (None if none)
+        commits_since_checkpoint: commits a fresh open has to replay
+        checkpoint_age_s: seconds since the latest checkpoint was written
+        log_files: JSON commit files still present in _delta_log/
+    """
+    uri = _get_uri(name)
+    try:
+        dt = _open_table(uri, _get_opts())
+    except Exception as e:
+        raise FileNotFoundError(f"Asset '{name}' not found: {e}")
+    return _log_health(dt, uri)
+
+
+def _after_write(
+    dt: DeltaTable,
+    uri: str,
+    name: str,
+    *,
+    zorder_by: list[str] | None = None,
+    profile: WriteProfile | None = None,
+    schema: pa.Schema | None = None,
+) -> None:
+    """Post-write upkeep: compaction/vacuum, then checkpointing.
+
+    Checkpoint last so it covers maintenance commits too. Results go on
+    the materialization in run.json, with a table_stats() summary of the
+    final version. Compaction rewrites files with the write profile, so
+    it doesn't undo the table's Parquet settings.
+
+    Storage (the table directory and `_delta_log/`) is listed only when a
+    checkpoint is due; see _file_stats() for the writes in between.
+    """
+    try:
+        health = _log_health(dt, uri, list_log=False)
+    except Exception as e:
+        print(f"⚠️  [checkpoint] {name}: skipped ({e})")
+        health = None
+    due = health is not None and _checkpoint_due(health)
+    try:
+        _, layout = _file_stats(dt, uri, list_storage=due)
+    except Exception:
+        layout = None
+    report = maybe_maintain(
+        dt, uri, name,
+        zorder_by=zorder_by,
+        writer_properties=profile.writer_properties(schema) if profile else None,
+        target_size=profile.target_file_size if profile else None,
+        layout=layout,
+    )
+    if report is not None and "vacuumed" in report:
+        # Vacuum changes storage without committing; compaction commits,
+        # and its removes are carried forward from the log.
+        with _tables_lock:
+            _stats_cache.pop(uri, None)
+    if health is not None:
+        health = _maybe_checkpoint(dt, uri, name, health)
+    if health is not None:
+        annotate_asset(f"subsets/{name}", log=health)
+    try:
+        stats, _ = _table_stats(dt, uri, log=health, list_storage=False)
+    except Exception as e:
+        print(f"⚠️  [stats] {name}: skipped ({e})")
+        return
+    annotate_asset(f"subsets/{name}", stats={k: v for k, v in stats.items() if k != "columns"})
+
+
+def _add_actions(dt: DeltaTable) -> pa.RecordBatch:
+    """The current version's add actions, flattened (path, size_bytes,
+    num_records, null_count.<col>, min.<col>, max.<col>, ...)."""
+    # deltalake ≥1.0 returns an arro3 RecordBatch; bridge to pyarrow.
+    return pa.record_batch(dt.get_add_actions(flatten=True))
+
+
+def _sum_column(adds: pa.RecordBatch, column: str, *, complete: bool = False) -> int:
+    """Sum a per-file stat. -1 if the column is missing, or if `complete`
+    and some file has no value for it."""
+    if column not in adds.schema.names:
+        return -1
+    col = adds.column(column)
+    if complete and col.null_count:
+        return -1
+    return int(pc.sum(col).as_py() or 0)
+
+
 def _target_row_count(dt: DeltaTable) -> int:
     """Sum num_records from the Delta log's add actions.
 
@@ -189,14 +492,174 @@ def _target_row_count(dt: DeltaTable) -> int:
     no data scan. Returns -1 if unavailable so callers can still report.
     """
     try:
-        # deltalake ≥1.0 returns an arro3 RecordBatch; bridge to pyarrow.
-        batch = pa.record_batch(dt.get_add_actions(flatten=True))
-        col = batch.column("num_records")
-        return int(sum(v for v in col.to_pylist() if v is not None))
+        return _sum_column(_add_actions(dt), "num_records")
     except Exception:
         return -1
 
 
+# =============================================================================
+# Table statistics
+#
+# Everything table_stats() reports comes from the Delta log and a listing
+# of the table directory — no data file is opened. The file-derived part
+# is cached per URI and table version, so the post-write summary,
+# maintenance's health check and later table_stats() calls at the same
+# version share one listing. Checkpoint fields can change without a new
+# version, so they come from the caller's log health or a fresh read.
+#
+# Writes list storage only on the checkpoint cadence. In between, a new
+# version's tombstones are the cached ones plus the remove actions of
+# the commits since (maintenance.carry_tombstones()), or unknown (None)
+# when nothing is cached in this process.
+# =============================================================================
+
+_stats_cache: dict[str, tuple[int, dict, tuple[dict[str, int], dict[str, int] | None]]] = {}
+
+
+def _size_distribution(sizes: list[int]) -> dict:
+    if not sizes:
+        return {"min": 0, "p50": 0, "p90": 0, "max": 0, "mean": 0}
+    ordered = sorted(sizes)
+
+    def pct(q: float) -> int:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "min": ordered[0],
+        "p50": pct(0.5),
+        "p90": pct(0.9),
+        "max": ordered[-1],
+        "mean": sum(ordered) // len(ordered),
+    }
+
+
+def _column_stats(adds: pa.RecordBatch, schema: pa.Schema) -> dict:
+    """Per-column min/max/null_count folded over the add actions' stats.
+
+    A value is None when any file lacks it (stats disabled for the
+    column, or written without stats), since a partial fold would lie.
+    """
+    names = set(adds.schema.names)
+
+    def fold(column: str, fn):
+        if column not in names:
+            return None
+        col = adds.column(column)
+        if col.null_count or len(col) == 0:
+            return None
+        return fn(col).as_py()
+
+    columns = {}
+    for field in schema:
+        nulls = fold(f"null_count.{field.name}", pc.sum)
+        columns[field.name] = {
+            "min": fold(f"min.{field.name}", pc.min),
+            "max": fold(f"max.{field.name}", pc.max),
+            "null_count": int(nulls) if nulls is not None else None,
+        }
+    return columns
+
+
+def _file_stats(
+    dt: DeltaTable, uri: str, *, list_storage: bool = True
+) -> tuple[dict, tuple[dict[str, int], dict[str, int] | None]]:
+    """(file-derived stats, file layout) for an open table's current
+    version, cached.
+
+    Tombstones come from a storage listing when `list_storage`, else are
+    carried forward from a cached older version through the log, else
+    are None (unknown).
+    """
+    version = dt.version()
+    with _tables_lock:
+        cached = _stats_cache.get(uri)
+    if cached is not None and cached[0] == version and (cached[2][1] is not None or not list_storage):
+        return cached[1], cached[2]
+
+    adds = _add_actions(dt)
+    if list_storage:
+        live, tombstoned = file_layout(dt, uri, adds)
+    else:
+        live = live_files(adds)
+        tombstoned = None
+        if cached is not None and cached[2][1] is not None and cached[0] < version:
+            tombstoned = carry_tombstones(uri, cached[2], cached[0], version, live)
+    sizes = adds.column("size_bytes").to_pylist()
+    stats = {
+        "version": version,
+        "rows": _sum_column(adds, "num_records"),
+        "files": len(sizes),
+        "bytes": sum(sizes),
+        "file_size": _size_distribution(sizes),
+        "columns": _column_stats(adds, pa.schema(dt.schema())),
+        "tombstone_files": len(tombstoned) if tombstoned is not None else None,
+        "tombstone_bytes": sum(tombstoned.values()) if tombstoned is not None else None,
+    }
+    layout = (live, tombstoned)
+    with _tables_lock:
+        _stats_cache[uri] = (version, stats, layout)
+    return stats, layout
+
+
+def _table_stats(
+    dt: DeltaTable, uri: str, log: dict | None = None, *, list_storage: bool = True
+) -> tuple[dict, tuple[dict[str, int], dict[str, int] | None]]:
+    """(stats, file layout) for an open table's current version.
+
+    `log` is _log_health() for this version if the caller already has it.
+    `list_storage` as for _file_stats().
+    """
+    stats, layout = _file_stats(dt, uri, list_storage=list_storage)
+    log = log or _log_health(dt, uri, list_log=list_storage)
+    stats = {
+        **stats,
+        "checkpoint_version": log["checkpoint_version"],
+        "commits_since_checkpoint": log["commits_since_checkpoint"],
+    }
+    return stats, layout
+
+
+def table_schema(name: str) -> pa.Schema:
+    """Schema of a published table, from its (cached) Delta log handle.
+
+    Raises FileNotFoundError if the table doesn't exist.
+    """
+    uri = _get_uri(name)
+    try:
+        dt = _open_table(uri, _get_opts())
+    except Exception as e:
+        if _is_table_not_found(e):
+            raise FileNotFoundError(f"Asset '{name}' not found: {e}") from e
+        raise
+    return pa.schema(dt.schema())
+
+
+def table_stats(name: str) -> dict:
+    """Statistics for a published table, from its Delta log.
+
+    Returns:
+        version: table version the stats describe
+        rows: total rows (-1 if some file has no row count)
+        files, bytes: live data files and their total size
+        file_size: live file sizes {min, p50, p90, max, mean}
+        columns: {column: {min, max, null_count}} — None where the log
+            has no stats for some file
+        checkpoint_version, commits_since_checkpoint: see log_health()
+        tombstone_files, tombstone_bytes: files removed from the table but
+            still on storage, awaiting vacuum
+
+    File statistics are cached per table version; a new commit is picked
+    up on the next call.
+    """
+    uri = _get_uri(name)
+    try:
+        dt = _open_table(uri, _get_opts())
+    except Exception as e:
+        raise FileNotFoundError(f"Asset '{name}' not found: {e}")
+    stats, _ = _table_stats(dt, uri)
+    return stats
+
+
 def _log_write(name: str, table: pa.Table, mode: str):
     """Log the write operation."""
     size_mb = round(table.nbytes / 1024 / 1024, 2)
@@ -232,71 +695,256 @@ def _log_write_meta(name: str, schema: pa.Schema, row_count: int, mode: str):
     )
 
 
-def _source_hash(source, schema: pa.Schema, target_row_count: int) -> str:
-    """Hash a merge source.
+# =============================================================================
+# Concurrent writes — commit-conflict retry and a bounded writer pool
+#
+# Delta commits are optimistic: when two writers race, the loser gets a
+# CommitFailedError once it sees the winner's commit. Writes here are
+# rerun against a freshly read table, with jittered exponential backoff,
+# up to DELTA_COMMIT_RETRIES times. Within a process, writes to the same
+# table are serialized (handles are shared, so they would only conflict);
+# conflicts come from other processes (DAG_PARALLELISM > 1, other runs).
+#
+# Reader sources are consumed by the first attempt and cannot be rerun;
+# their conflicts are counted and raised.
+#
+# Counters (node "metrics" in run.json):
+#     delta.commit_conflicts: CommitFailedErrors seen
+#     delta.commit_retries: attempts rerun after a conflict
+# =============================================================================
+
+_table_locks: dict[str, threading.Lock] = {}
 
-    For a Table: hash source rowcount + schema (stable across runs when the
-    source is unchanged).
-    For a RecordBatchReader: the stream has been consumed by deltalake by now,
-    so we fall back to target rowcount + schema. This isn't a source-only
-    fingerprint but it's still a stable descriptor of the written state.
-    """
-    import hashlib
-    h = hashlib.md5()
-    if isinstance(source, pa.Table):
-        h.update(f"{len(source)}".encode())
-    else:
-        h.update(f"{target_row_count}".encode())
-    h.update(str(schema).encode())
-    return h.hexdigest()[:16]
 
+def _table_lock(uri: str) -> threading.Lock:
+    with _tables_lock:
+        return _table_locks.setdefault(uri, threading.Lock())
 
-def _validate_keys(table: pa.Table, keys: list[str], name: str):
-    """Validate key columns before merge.
 
-    Checks:
-    1. Key columns exist
-    2. Key columns have no nulls
-    3. Key combination is unique (no duplicates)
+def _is_commit_conflict(exc: Exception) -> bool:
+    if CommitFailedError is not None and isinstance(exc, CommitFailedError):
+        return True
+    msg = str(exc).lower()
+    return "commit failed" in msg or "concurrent transaction" in msg
+
+
+def _commit_retries() -> int:
+    return max(0, _env_number("DELTA_COMMIT_RETRIES", 5))
+
+
+def _retry_delay(attempt: int) -> float:
+    base = _env_number("DELTA_COMMIT_BACKOFF_S", 0.5, float)
+    return min(base * 2 ** (attempt - 1), 30.0) * random.uniform(0.5, 1.5)
+
+
+def _retry_on_conflict(name: str, uri: str, attempt_fn, *, retryable: bool):
+    """Run attempt_fn(), rerunning it on commit conflicts."""
+    retries = _commit_retries()
+    attempt = 0
+    while True:
+        try:
+            return attempt_fn()
+        except Exception as e:
+            if not _is_commit_conflict(e):
+                raise
+            record_metric("delta.commit_conflicts")
+            _invalidate_uri(uri)
+            if not retryable:
+                raise RuntimeError(
+                    f"[{name}] commit conflict on a streamed source, which can't be "
+                    f"replayed. Materialize it or serialize writers to this table."
+                ) from e
+            if attempt >= retries:
+                raise
+            attempt += 1
+            delay = _retry_delay(attempt)
+            record_metric("delta.commit_retries")
+            print(f"[retry] {name}: commit conflict, retrying in {delay:.1f}s ({attempt}/{retries})")
+            time.sleep(delay)
+
+
+def _write_concurrency() -> int:
+    return max(1, _env_number("DELTA_WRITE_CONCURRENCY", 4))
+
+
+class WriterPool:
+    """Bounded pool of concurrent Delta writes.
+
+    Each submitted call runs on a worker thread in a copy of the caller's
+    context, so tracking attributes its writes to the current node.
+
+        with WriterPool() as pool:
+            for name, table in tables.items():
+                pool.submit(merge, table, name, key="date")
+
+    Leaving the block waits for every write and re-raises the first
+    failure (after the rest have finished). Results are in pool.results
+    in submission order.
+
+    Args:
+        max_workers: Concurrent writes (default DELTA_WRITE_CONCURRENCY, 4).
     """
-    # Check columns exist
-    for k in keys:
-        if k not in table.column_names:
-            raise ValueError(f"[{name}] Key column '{k}' not found. Columns: {table.column_names}")
 
-    # Check for nulls in key columns
+    def __init__(self, max_workers: int | None = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or _write_concurrency(),
+            thread_name_prefix="delta-writer",
+        )
+        self._futures: list[Future] = []
+        self.results: list = []
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        ctx = contextvars.copy_context()
+        future = self._executor.submit(ctx.run, fn, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def __enter__(self) -> "WriterPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._executor.shutdown(wait=True)
+        self.results = [f.result() if f.exception() is None else None for f in self._futures]
+        if exc_type is None:
+            for f in self._futures:
+                if f.exception() is not None:
+                    raise f.exception()
+
+
+# =============================================================================
+# Merge rewrite amplification
+#
+# A merge rewrites every data file holding a row it updates, so the cost
+# of a revision is the size of the files it lands in, not of the change.
+# Two things keep that down without deletion vectors (delta-rs can't write
+# tables with the deletionVectors feature yet):
+# - update="changed" only updates matched rows whose values differ, so
+#   files where every matched row is identical are left alone
+# - for Table sources the predicate is narrowed to the source's key range,
+#   letting the merge skip target files by their min/max stats
+# The merge's own metrics land on the materialization as "merge".
+# =============================================================================
+
+def _sql_literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (date, datetime)):
+        return f"'{value.isoformat()}'"
+    return repr(value)
+
+
+def _key_range_predicate(source, keys: list[str], key_bounds: dict | None = None) -> str | None:
+    """`target.k BETWEEN min AND max` per key, or None.
+
+    Bounds come from `key_bounds` where given, else from a Table source;
+    a reader's other keys can't be bounded without draining it.
+    """
+    key_bounds = key_bounds or {}
+    is_reader = isinstance(source, pa.RecordBatchReader)
+    parts = []
     for k in keys:
-        null_count = table[k].null_count
-        if null_count > 0:
-            raise ValueError(f"[{name}] Key column '{k}' has {null_count} nulls. Merge keys cannot be null.")
-
-    # Check uniqueness - group by keys and look for duplicates
-    if len(keys) == 1:
-        # Single key - use value_counts
-        key_col = table[keys[0]]
-        unique_count = len(key_col.unique())
-        if unique_count != len(table):
-            dup_count = len(table) - unique_count
-            raise ValueError(
-                f"[{name}] Key '{keys[0]}' has {dup_count} duplicate values. "
-                f"Merge key must be unique. Check your data or add more columns to key."
-            )
-    else:
-        # Composite key - need to check combination
-        import pyarrow.compute as pc
+        t = source.schema.field(k).type
+        if not (pa.types.is_integer(t) or pa.types.is_floating(t) or pa.types.is_string(t)
+                or pa.types.is_large_string(t) or pa.types.is_date(t)):
+            continue
+        if k in key_bounds:
+            lo, hi = key_bounds[k]
+        elif is_reader:
+            continue
+        else:
+            bounds = pc.min_max(source[k])
+            lo, hi = bounds["min"].as_py(), bounds["max"].as_py()
+        # NaN/±inf bounds have no SQL literal; skip pruning on that key
+        if lo is None or (isinstance(lo, float) and not (math.isfinite(lo) and math.isfinite(hi))):
+            continue
+        parts.append(f"target.{k} >= {_sql_literal(lo)} AND target.{k} <= {_sql_literal(hi)}")
+    return " AND ".join(parts) or None
+
+
+def _changed_predicate(column_names: list[str], keys: list[str]) -> str | None:
+    """Matched rows whose non-key values differ (null-safe)."""
+    value_cols = [c for c in column_names if c not in keys]
+    if not value_cols:
+        return None
+    return " OR ".join(f"(target.{c} IS DISTINCT FROM source.{c})" for c in value_cols)
+
+
+def _merge_stats(metrics: dict) -> dict:
+    """Rewrite amplification from a merge's execute() metrics."""
+    updated = metrics.get("num_target_rows_updated", 0)
+    copied = metrics.get("num_target_rows_copied", 0)
+    return {
+        "rows_inserted": metrics.get("num_target_rows_inserted", 0),
+        "rows_updated": updated,
+        "rows_copied": copied,
+        "files_scanned": metrics.get("num_target_files_scanned", 0),
+        "files_skipped": metrics.get("num_target_files_skipped_during_scan", 0),
+        "files_rewritten": metrics.get("num_target_files_removed", 0),
+        "files_added": metrics.get("num_target_files_added", 0),
+        # Rows rewritten per row actually changed; 1.0 is ideal
+        "amplification": round((updated + copied) / updated, 2) if updated else None,
+    }
 
-        # Concatenate key columns as strings for uniqueness check
-        combined = pc.binary_join_element_wise(
-            *[pc.cast(table[k], pa.string()) for k in keys],
-            "||"
-        )
-        unique_count = len(combined.unique())
-        if unique_count != len(table):
-            dup_count = len(table) - unique_count
-            raise ValueError(
-                f"[{name}] Key {keys} has {dup_count} duplicate combinations. "
-                f"Merge key must be unique. Check your data or add more columns to key."
-            )
+
+def _table_config(profile: WriteProfile | None, change_data_feed: bool) -> dict[str, str]:
+    """Table properties a write asks for: the profile's, plus CDF if enabled."""
+    config = profile.table_configuration() if profile else {}
+    if change_data_feed:
+        config["delta.enableChangeDataFeed"] = "true"
+    return config
+
+
+def _sync_table_properties(dt: DeltaTable, config: dict[str, str], name: str) -> None:
+    """Bring the table's properties in line with `config` (a commit only if they differ)."""
+    if not config:
+        return
+    current = dt.metadata().configuration
+    changed = {k: v for k, v in config.items() if current.get(k) != v}
+    if changed:
+        dt.alter.set_table_properties(changed, commit_properties=_run_commit_properties())
+        print(f"[properties] {name}: set {', '.join(f'{k}={v}' for k, v in changed.items())}")
+
+
+# =============================================================================
+# Write state — last written content fingerprint per table
+#
+# Kept in state/_subsets/<name>.json as {"fingerprint", "version"}. A
+# merge/overwrite is elided when the incoming fingerprint matches AND the
+# table is still at the version we left it at, i.e. nobody else has
+# committed since. Our own follow-up commits (maintenance, publish)
+# re-record the version so they don't defeat the check. publish() adds
+# "metadata_fingerprint", the hash of the description last published.
+# =============================================================================
+
+def _write_state_asset(name: str) -> str:
+    return f"_subsets/{name}"
+
+
+def _load_write_state(name: str) -> dict:
+    # Through the cached state handle: read once per process, not on
+    # every check and save of every write
+    return dict(state(_write_state_asset(name)))
+
+
+def _save_write_state(name: str, **fields) -> None:
+    handle = state(_write_state_asset(name))
+    handle.update(fields)
+    handle.flush()
+
+
+def _is_unchanged(name: str, dt: DeltaTable, fingerprint: str) -> bool:
+    written = _load_write_state(name)
+    return written.get("fingerprint") == fingerprint and written.get("version") == dt.version()
+
+
+def _skipped_write(name: str, uri: str, dt: DeltaTable, fingerprint: str, mode: str) -> "WriteResult":
+    """WriteResult for an elided write: current version, no new commit."""
+    version = dt.version()
+    count = _target_row_count(dt)
+    print(f"[{mode}] {name}: unchanged (fingerprint {fingerprint}), no commit — still v{version}")
+    record_write(f"subsets/{name}", version=version, hash=fingerprint)
+    annotate_asset(f"subsets/{name}", skipped=True)
+    return WriteResult(uri=uri, version=version, hash=fingerprint, rows=count)
 
 
 def merge(
@@ -305,7 +953,13 @@ def merge(
     *,
     key: Union[str, list[str]],
     partition_by: list[str] = None,
-    validate: bool = True
+    validate: bool = True,
+    fingerprint: str | None = None,
+    profile: WriteProfile | None = None,
+    update: str = "changed",
+    change_data_feed: bool = False,
+    metadata: dict | None = None,
+    key_bounds: dict[str, tuple] | None = None,
 ) -> "WriteResult":
     """Upsert data into a Delta table.
 
@@ -317,93 +971,197 @@ def merge(
         source: PyArrow Table or RecordBatchReader. Readers stream batches
             through deltalake without materializing the full dataset in
             memory — use this for large sources via DuckDB's
-            fetch_record_batch() or similar. validate=True is incompatible
-            with readers (would consume the stream).
+            fetch_record_batch() or similar. A reader is consumed by the
+            first attempt, so a commit conflict with another writer is
+            raised instead of retried (Tables are retried up to
+            DELTA_COMMIT_RETRIES times).
         name: Dataset name
         key: Column(s) that uniquely identify a record
         partition_by: Optional columns to partition by
-        validate: Check key uniqueness before merge (default True).
-            Must be False for RecordBatchReader sources.
+        validate: Check keys are present, non-null and unique (default
+            True). Tables are checked up front; readers are checked as
+            they stream (see keycheck.py) and a violation aborts the merge
+            before it commits. Either way a ValueError is raised.
+        fingerprint: Content fingerprint of the source, if the caller has
+            one. Defaults to data_hash() for Tables. When it matches the
+            last fingerprint written to this table and nothing has been
+            committed since, the merge is skipped — no write, no commit.
+            Readers can only be skipped when a fingerprint is passed;
+            otherwise they are hashed as they stream.
+        profile: Parquet write profile (see profiles.py). Defaults to the
+            one registered with set_write_profile(name), else deltalake's
+            defaults.
+        update: "changed" (default) updates only matched rows whose values
+            differ, so files where nothing changed aren't rewritten. "all"
+            updates every matched row.
+        change_data_feed: Enable Delta change data feed on the table (a
+            no-op once enabled), so consumers can read just the rows
+            changed between versions with load_changes().
+        metadata: Dataset metadata, as for publish(). When this merge
+            creates the table, the description is written in the same
+            commit and the following publish() returns without opening
+            the table. Existing tables still get it from publish().
+        key_bounds: {key column: (min, max)} of the source, when the caller
+            knows them. The merge only scans target rows in that range.
+            Tables compute this themselves; for readers it is the only
+            way to get the pruning.
 
     Returns:
         WriteResult with uri, version, hash, rows.
     """
     is_reader = isinstance(source, pa.RecordBatchReader)
-    if is_reader and validate:
-        raise ValueError(
-            "merge(): validate=True cannot be combined with a RecordBatchReader "
-            "source — the stream would be consumed by validation. Pass "
-            "validate=False or materialize to a pa.Table first."
-        )
 
     if not is_reader and len(source) == 0:
         print(f"[merge] {name}: no data to write")
         return None
 
+    if update not in ("changed", "all"):
+        raise ValueError(f"merge(): update must be 'changed' or 'all', got {update!r}")
+
     # Normalize key to list
     keys = [key] if isinstance(key, str) else key
 
-    # Validate keys (table-only)
-    if validate:
-        _validate_keys(source, keys, name)
+    if metadata is not None:
+        from .publish import _check_required
+        _check_required(metadata)
+
+    # Tables are validated here; readers once we know we're writing
+    if validate and not is_reader:
+        validate_keys(source, keys, name)
 
     schema = source.schema
     column_names = [f.name for f in schema]
 
+    hasher = None
+    if fingerprint is None and not is_reader:
+        fingerprint = data_hash(source)
+    elif fingerprint is None:
+        source, hasher = hashing_reader(source)
+
+    profile = resolve_profile(name, profile)
+    if profile is not None:
+        source = sort_source(source, profile.sort_columns(keys))
+
     uri = _get_uri(name)
+    with _table_lock(uri):
+        return _retry_on_conflict(
+            name, uri,
+            lambda: _merge_once(
+                source, name, uri, keys, column_names, schema, partition_by,
+                validate and is_reader, fingerprint, hasher, profile, update,
+                _table_config(profile, change_data_feed), metadata, key_bounds,
+            ),
+            retryable=not is_reader,
+        )
+
+
+def _merge_once(
+    source, name, uri, keys, column_names, schema, partition_by,
+    validate_stream, fingerprint, hasher, profile, update, config, metadata,
+    key_bounds=None,
+) -> "WriteResult":
+    """One merge attempt against the latest table version."""
     opts = _get_opts()
+    writer_properties = profile.writer_properties(schema) if profile else None
 
     # Probe for table existence. If it doesn't exist yet, create it via
     # write_deltalake. Any OTHER exception must propagate — we must NOT
     # silently fall back to overwrite mode because that would destroy an
     # existing table's contents on a transient merge failure.
     try:
-        dt = DeltaTable(uri, storage_options=opts)
+        dt = _open_table(uri, opts)
         table_exists = True
     except Exception as e:
         if not _is_table_not_found(e):
             raise
         table_exists = False
 
+    if table_exists and fingerprint is not None and _is_unchanged(name, dt, fingerprint):
+        return _skipped_write(name, uri, dt, fingerprint, "merge")
+    if table_exists:
+        _sync_table_properties(dt, config, name)
+
+    checker = None
+    if validate_stream:
+        source, checker = validating_reader(source, keys, name)
+
+    merge_stats = None
+    created = {}
     if not table_exists:
-        write_deltalake(
-            uri,
-            source,
-            mode="overwrite",
-            partition_by=partition_by,
-            storage_options=opts,
-            commit_properties=_run_commit_properties(),
-        )
-        dt = DeltaTable(uri, storage_options=opts)
+        # A new table can take its description in the creating commit.
+        description = None
+        if metadata is not None:
+            from .publish import _description_json, _metadata_fingerprint
+            description = _description_json(name, metadata, set(column_names))
+        created["metadata_fingerprint"] = _metadata_fingerprint(metadata) if metadata is not None else None
+        try:
+            write_deltalake(
+                uri,
+                source,
+                mode="overwrite",
+                partition_by=partition_by,
+                storage_options=opts,
+                configuration=config or None,
+                target_file_size=profile.target_file_size if profile else None,
+                writer_properties=writer_properties,
+                description=description,
+                commit_properties=_run_commit_properties(),
+            )
+        except Exception as e:
+            # deltalake wraps errors raised by the stream; surface ours
+            if checker is not None and checker.error is not None:
+                raise checker.error from e
+            raise
+        dt = _open_table(uri, opts)
         new_count = _target_row_count(dt)
         version = dt.version()
-        h = _source_hash(source, schema, new_count)
         _log_write_meta(name, schema, new_count, "merge (created)")
     else:
         # Build merge predicate
         predicate = " AND ".join([f"target.{k} = source.{k}" for k in keys])
+        key_range = _key_range_predicate(source, keys, key_bounds)
+        if key_range:
+            predicate = f"{predicate} AND {key_range}"
         updates = {col: f"source.{col}" for col in column_names}
+        update_when = _changed_predicate(column_names, keys) if update == "changed" else None
+
+        # Executing through the cached handle advances it to the new version.
+        # On failure its state is unknown, so drop it.
+        try:
+            metrics = dt.merge(
+                source=source,
+                predicate=predicate,
+                source_alias="source",
+                target_alias="target",
+                writer_properties=writer_properties,
+                commit_properties=_run_commit_properties(),
+            ).when_matched_update(
+                updates=updates,
+                predicate=update_when,
+            ).when_not_matched_insert(
+                updates=updates
+            ).execute()
+        except Exception as e:
+            _invalidate_uri(uri)
+            if checker is not None and checker.error is not None:
+                raise checker.error from e
+            raise
 
-        dt.merge(
-            source=source,
-            predicate=predicate,
-            source_alias="source",
-            target_alias="target",
-            commit_properties=_run_commit_properties(),
-        ).when_matched_update(
-            updates=updates
-        ).when_not_matched_insert(
-            updates=updates
-        ).execute()
+        merge_stats = _merge_stats(metrics)
+        record_metric("delta.merge_files_rewritten", merge_stats["files_rewritten"])
+        record_metric("delta.merge_rows_copied", merge_stats["rows_copied"])
 
         # Rowcount from Delta log (parquet footers), not by materializing target.
-        # Hash on source rowcount+schema — stable fingerprint for unchanged inputs.
         new_count = _target_row_count(dt)
         version = dt.version()
-        h = _source_hash(source, schema, new_count)
         _log_write_meta(name, schema, new_count, f"merge → {new_count:,} total")
 
+    h = fingerprint if hasher is None else hasher.hexdigest()
     record_write(f"subsets/{name}", version=version, hash=h)
+    if merge_stats is not None:
+        annotate_asset(f"subsets/{name}", merge=merge_stats)
+    _after_write(dt, uri, name, zorder_by=keys, profile=profile, schema=schema)
+    _save_write_state(name, fingerprint=h, version=dt.version(), **created)
     return WriteResult(uri=uri, version=version, hash=h, rows=new_count)
 
 
@@ -411,7 +1169,10 @@ def overwrite(
     source: Union[pa.Table, pa.RecordBatchReader],
     name: str,
     *,
-    partition_by: list[str] = None
+    partition_by: list[str] = None,
+    fingerprint: str | None = None,
+    profile: WriteProfile | None = None,
+    change_data_feed: bool = False
 ) -> "WriteResult":
     """Replace entire Delta table with new data.
 
@@ -427,7 +1188,16 @@ def overwrite(
 
     Accepts a pa.Table or pa.RecordBatchReader. Readers stream through
     deltalake without materializing the full source in memory — use via
-    DuckDB's fetch_record_batch() or similar.
+    DuckDB's fetch_record_batch() or similar. As with merge(), commit
+    conflicts are retried for Tables only; a reader's is raised.
+
+    Like merge(), skips the write entirely when the source fingerprint
+    (data_hash() for Tables, or `fingerprint` if passed) matches the last
+    one written and the table hasn't changed since.
+
+    `profile` sets the Parquet layout as for merge(); sort_by_key has no
+    key to use here, so give sort_by explicitly. `change_data_feed` enables
+    CDF as for merge(); an overwrite shows up there as deletes + inserts.
     """
     is_reader = isinstance(source, pa.RecordBatchReader)
 
@@ -437,26 +1207,75 @@ def overwrite(
 
     schema = source.schema
 
+    hasher = None
+    if fingerprint is None and not is_reader:
+        fingerprint = data_hash(source)
+    elif fingerprint is None:
+        source, hasher = hashing_reader(source)
+
+    profile = resolve_profile(name, profile)
+    if profile is not None:
+        source = sort_source(source, profile.sort_columns())
+
     uri = _get_uri(name)
+    with _table_lock(uri):
+        return _retry_on_conflict(
+            name, uri,
+            lambda: _overwrite_once(
+                source, name, uri, schema, partition_by, fingerprint, hasher, profile,
+                _table_config(profile, change_data_feed),
+            ),
+            retryable=not is_reader,
+        )
+
+
+def _overwrite_once(source, name, uri, schema, partition_by, fingerprint, hasher, profile, config) -> "WriteResult":
+    """One overwrite attempt against the latest table version."""
     opts = _get_opts()
 
-    write_deltalake(
-        uri,
-        source,
-        mode="overwrite",
-        partition_by=partition_by,
-        storage_options=opts,
-        schema_mode="overwrite",
-        commit_properties=_run_commit_properties(),
-    )
+    if fingerprint is not None or config:
+        try:
+            dt = _open_table(uri, opts)
+        except Exception as e:
+            if not _is_table_not_found(e):
+                raise
+        else:
+            if fingerprint is not None and _is_unchanged(name, dt, fingerprint):
+                return _skipped_write(name, uri, dt, fingerprint, "overwrite")
+            _sync_table_properties(dt, config, name)
 
-    dt = DeltaTable(uri, storage_options=opts)
+    # Write through the cached handle when there is one so it advances in
+    # place; otherwise the post-write open below caches a fresh handle.
+    cached = _cached_table(uri)
+    try:
+        write_deltalake(
+            cached if cached is not None else uri,
+            source,
+            mode="overwrite",
+            partition_by=partition_by,
+            storage_options=opts,
+            schema_mode="overwrite",
+            configuration=config or None,
+            target_file_size=profile.target_file_size if profile else None,
+            writer_properties=profile.writer_properties(schema) if profile else None,
+            commit_properties=_run_commit_properties(),
+        )
+    except Exception:
+        _invalidate_uri(uri)
+        raise
+
+    dt = _open_table(uri, opts)
     version = dt.version()
     new_count = _target_row_count(dt)
-    h = _source_hash(source, schema, new_count)
+    h = fingerprint if hasher is None else hasher.hexdigest()
 
     _log_write_meta(name, schema, new_count, "overwrite")
     record_write(f"subsets/{name}", version=version, hash=h)
+    _after_write(dt, uri, name, profile=profile, schema=schema)
+    # A freshly created table has no description yet, whatever was
+    # published to an earlier table under this name.
+    created = {"metadata_fingerprint": None} if version == 0 else {}
+    _save_write_state(name, fingerprint=h, version=dt.version(), **created)
     return WriteResult(uri=uri, version=version, hash=h, rows=new_count)
 
 
@@ -464,7 +1283,9 @@ def append(
     source: Union[pa.Table, pa.RecordBatchReader],
     name: str,
     *,
-    partition_by: list[str] = None
+    partition_by: list[str] = None,
+    profile: WriteProfile | None = None,
+    change_data_feed: bool = False
 ) -> "WriteResult":
     """Append data to a Delta table.
 
@@ -479,6 +1300,9 @@ def append(
     Accepts pa.Table or pa.RecordBatchReader. Readers stream through
     deltalake without materializing in memory — use for chunked loads
     (e.g. per-partition dedup) driven by DuckDB's fetch_record_batch().
+    As with merge(), commit conflicts are retried for Tables only.
+
+    `profile` and `change_data_feed` work as for merge() and overwrite().
     """
     is_reader = isinstance(source, pa.RecordBatchReader)
 
@@ -491,24 +1315,69 @@ def append(
 
     schema = source.schema
 
+    # Appends are never elided (identical rows are a legitimate append),
+    # so the fingerprint is only reported.
+    if is_reader:
+        source, hasher = hashing_reader(source)
+        h = None
+    else:
+        hasher = None
+        h = data_hash(source)
+
+    profile = resolve_profile(name, profile)
+    if profile is not None:
+        source = sort_source(source, profile.sort_columns())
+
     uri = _get_uri(name)
+    with _table_lock(uri):
+        return _retry_on_conflict(
+            name, uri,
+            lambda: _append_once(
+                source, name, uri, schema, partition_by, h, hasher, profile,
+                _table_config(profile, change_data_feed),
+            ),
+            retryable=not is_reader,
+        )
+
+
+def _append_once(source, name, uri, schema, partition_by, h, hasher, profile, config) -> "WriteResult":
+    """One append attempt against the latest table version."""
     opts = _get_opts()
 
-    write_deltalake(
-        uri,
-        source,
-        mode="append",
-        partition_by=partition_by,
-        storage_options=opts,
-        schema_mode="merge",  # Allow schema evolution for append
-        commit_properties=_run_commit_properties(),
-    )
+    if config:
+        try:
+            _sync_table_properties(_open_table(uri, opts), config, name)
+        except Exception as e:
+            if not _is_table_not_found(e):
+                raise
 
-    dt = DeltaTable(uri, storage_options=opts)
+    # Write through the cached handle when there is one so it advances in
+    # place; otherwise the post-write open below caches a fresh handle.
+    cached = _cached_table(uri)
+    try:
+        write_deltalake(
+            cached if cached is not None else uri,
+            source,
+            mode="append",
+            partition_by=partition_by,
+            storage_options=opts,
+            schema_mode="merge",  # Allow schema evolution for append
+            configuration=config or None,
+            target_file_size=profile.target_file_size if profile else None,
+            writer_properties=profile.writer_properties(schema) if profile else None,
+            commit_properties=_run_commit_properties(),
+        )
+    except Exception:
+        _invalidate_uri(uri)
+        raise
+
+    dt = _open_table(uri, opts)
     version = dt.version()
     new_count = _target_row_count(dt)
-    h = _source_hash(source, schema, new_count)
+    if hasher is not None:
+        h = hasher.hexdigest()
 
     _log_write_meta(name, schema, new_count, "append")
     record_write(f"subsets/{name}", version=version, hash=h)
+    _after_write(dt, uri, name, profile=profile, schema=schema)
     return WriteResult(uri=uri, version=version, hash=h, rows=new_count)
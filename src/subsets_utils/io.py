@@ -11,29 +11,58 @@ removed, those URIs will return `s3://` and io.py will start streaming
 writes directly to R2 via s3fs multipart upload — no changes here
 required.
 
+Compression: save_raw_file/save_raw_json/save_raw_many/raw_writer take
+codec="gzip"|"zstd" (plus level, and for zstd an optional trained
+dictionary). The extension is unchanged. JSON and NDJSON readers detect
+the codec from the payload's magic bytes (see compression.py); readers of
+other formats return the stored bytes unless asked to decompress
+(load_raw_file/load_raw_many(decompress=True), raw_reader(compression=
+"detect")), since a binary payload may itself be a gzip download.
+
 Streaming: for datasets that don't fit in memory use `raw_writer()`
-(generic byte stream) or `raw_parquet_writer()` (row-group streaming
-ParquetWriter). Both are context managers that yield a file-like
-object or a writer, bounded by fsspec's block size.
+(generic byte stream), `raw_parquet_writer()` (row-group streaming
+ParquetWriter) or `raw_ndjson_writer()` (one JSON record per line). All
+are context managers that yield a file-like object or a writer, bounded
+by fsspec's block size; `iter_raw_ndjson()` reads records back lazily.
 """
 
 import io
 import json
-import gzip
+import atexit
+import contextvars
 import hashlib
+import os
+import re
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional
+from collections.abc import MutableMapping
+from typing import Iterator, Optional
 
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
-from deltalake import DeltaTable
+
+try:
+    import xxhash  # optional: ~10x faster than blake2b for large tables
+except ImportError:
+    xxhash = None
+
+try:
+    import orjson  # optional: several times faster JSON encode/decode
+except ImportError:
+    orjson = None
 
 from . import debug
+from .cache import cache_for
+from . import compression as codecs
 from .config import (
     is_cloud, get_data_dir, get_storage_options, get_bucket_name,
-    get_fs, get_fsspec_storage_options,
+    get_fs, get_fsspec_storage_options, get_arrow_fs,
     raw_uri, state_uri, subsets_uri, raw_key, state_key,
     mirror_raw_path, mirror_state_path,
 )
@@ -62,16 +91,55 @@ def _read_with_mirror_fallback(uri: str, mirror: Path | None) -> Optional[bytes]
 # URI dispatch via fsspec
 # =============================================================================
 
-def _write_bytes(uri: str, data: bytes) -> None:
-    """Write bytes to a URI (s3:// or local path) via fsspec."""
+def _write_bytes(uri: str, data: bytes, *, defer: bool = True) -> None:
+    """Write bytes to a URI (s3:// or local path) via fsspec.
+
+    Remote writes go through to the local disk cache (see cache.py), and
+    are queued for a background upload when write-behind is on (see
+    below) unless `defer` is False.
+    """
+    uploader = _write_behind_for(uri) if defer else None
+    if uploader is not None:
+        uploader.submit(uri, data)
+        return
+    _write_bytes_now(uri, data)
+
+
+def _write_bytes_now(uri: str, data: bytes) -> None:
     fs = get_fs(uri)
     with fs.open(uri, "wb") as f:
         f.write(data)
+    cache = cache_for(uri)
+    if cache is not None:
+        cache.put(uri, fs, data)
+
+
+def _write_bytes_atomic(uri: str, data: bytes, *, defer: bool = True) -> None:
+    """_write_bytes, but readers never see a partial file: local writes go
+    to a temp file that is renamed into place (an S3 PUT already is atomic)."""
+    if "://" in uri:
+        _write_bytes(uri, data, defer=defer)
+        return
+    path = Path(uri)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
 
 def _read_bytes(uri: str) -> Optional[bytes]:
-    """Read bytes from a URI via fsspec. Returns None if not found."""
+    """Read bytes from a URI via fsspec. Returns None if not found.
+
+    Remote reads are served from the local disk cache when its copy is
+    still current, or from the write-behind queue if not yet uploaded.
+    """
+    queued = _queued_bytes(uri)
+    if queued is not None:
+        return queued
     fs = get_fs(uri)
+    cache = cache_for(uri)
+    if cache is not None:
+        return cache.read(uri, fs)
     try:
         with fs.open(uri, "rb") as f:
             return f.read()
@@ -81,39 +149,252 @@ def _read_bytes(uri: str) -> Optional[bytes]:
 
 def _exists(uri: str) -> bool:
     """Check if a URI exists."""
-    return get_fs(uri).exists(uri)
+    return _queued_bytes(uri) is not None or get_fs(uri).exists(uri)
 
 
 def _delete(uri: str) -> None:
     """Delete a URI. No-op if already absent."""
+    _settle(uri)
     fs = get_fs(uri)
     if fs.exists(uri):
         fs.rm(uri)
+    cache = cache_for(uri)
+    if cache is not None:
+        cache.discard(uri)
+
+
+# =============================================================================
+# Write-behind uploads
+#
+# In cloud mode every save_raw_json/save_state blocks on a PUT. With
+# RAW_WRITE_BEHIND=1, byte writes to remote URIs (save_raw_file/json/
+# parquet, state) are queued and uploaded by a background thread pool,
+# so fetching overlaps uploading:
+#
+# - Repeated writes to one URI coalesce: a queued payload is replaced, so
+#   only the last version of a state checkpoint is uploaded.
+# - Reads of a queued URI through this module see the queued bytes;
+#   streaming/Arrow/bulk readers and writers wait for that URI's upload.
+# - flush_io() is the durability barrier: it waits for every upload and
+#   raises the first failure. The orchestrator calls it when a node's
+#   function returns — including when it asks for a continuation — so a
+#   failed upload fails the node. A failure also raises on the next write.
+# - At most RAW_WRITE_BEHIND_MAX_PENDING (default 256) URIs are queued;
+#   writers block beyond that.
+#
+# Streaming writers (raw_writer, raw_parquet_writer, save_raw_arrow) and
+# save_raw_many stay synchronous: they already stream or batch.
+#
+# Config (env vars):
+#     RAW_WRITE_BEHIND: "1" enables (default off)
+#     RAW_WRITE_BEHIND_WORKERS: upload threads (default 8)
+#     RAW_WRITE_BEHIND_MAX_PENDING: queued URIs before writers block
+# =============================================================================
+
+class _WriteBehind:
+    def __init__(self, workers: int, max_pending: int):
+        self._cond = threading.Condition()
+        self._queued: dict[str, bytes] = {}
+        self._inflight: dict[str, bytes] = {}
+        self._errors: list[tuple[str, Exception]] = []
+        self._max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="write-behind")
+
+    def submit(self, uri: str, data: bytes) -> None:
+        from .tracking import record_metric
+        with self._cond:
+            self._raise_errors()
+            if uri in self._queued:
+                self._queued[uri] = data
+                record_metric("write_behind.coalesced")
+                return
+            self._cond.wait_for(lambda: len(self._queued) + len(self._inflight) < self._max_pending)
+            self._queued[uri] = data
+            record_metric("write_behind.queued")
+            # An upload of this URI in flight reschedules itself when done
+            if uri not in self._inflight:
+                self._pool.submit(self._upload, uri)
+
+    def _upload(self, uri: str) -> None:
+        with self._cond:
+            data = self._inflight[uri] = self._queued.pop(uri)
+        try:
+            _write_bytes_now(uri, data)
+        except Exception as e:  # raised by flush() / the next submit()
+            with self._cond:
+                self._errors.append((uri, e))
+        finally:
+            with self._cond:
+                del self._inflight[uri]
+                if uri in self._queued:
+                    self._pool.submit(self._upload, uri)
+                self._cond.notify_all()
+
+    def peek(self, uri: str) -> bytes | None:
+        """Latest bytes written to `uri` and not yet uploaded."""
+        with self._cond:
+            data = self._queued.get(uri)
+            return self._inflight.get(uri) if data is None else data
+
+    def wait(self, uri: str | None = None) -> None:
+        """Block until `uri` (or everything) is uploaded."""
+        with self._cond:
+            if uri is None:
+                self._cond.wait_for(lambda: not self._queued and not self._inflight)
+            else:
+                self._cond.wait_for(lambda: uri not in self._queued and uri not in self._inflight)
+
+    def flush(self) -> None:
+        self.wait()
+        with self._cond:
+            self._raise_errors()
+
+    def _raise_errors(self) -> None:
+        if self._errors:
+            errors, self._errors = self._errors, []
+            uri, error = errors[0]
+            more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+            raise RuntimeError(f"Write-behind upload to {uri} failed{more}: {error}") from error
+
+
+_write_behind: _WriteBehind | None = None
+_write_behind_pid: int | None = None
+_write_behind_lock = threading.Lock()
+
+
+def _get_write_behind() -> _WriteBehind | None:
+    """The process's uploader, or None if write-behind is off. A forked
+    child gets its own (the parent's threads don't survive the fork)."""
+    global _write_behind, _write_behind_pid
+    if os.environ.get("RAW_WRITE_BEHIND", "0") != "1":
+        return None
+    with _write_behind_lock:
+        if _write_behind is None or _write_behind_pid != os.getpid():
+            _write_behind = _WriteBehind(
+                int(os.environ.get("RAW_WRITE_BEHIND_WORKERS", 8)),
+                int(os.environ.get("RAW_WRITE_BEHIND_MAX_PENDING", 256)),
+            )
+            _write_behind_pid = os.getpid()
+        return _write_behind
+
+
+def _write_behind_for(uri: str) -> _WriteBehind | None:
+    return _get_write_behind() if "://" in uri else None
+
+
+def _queued_bytes(uri: str) -> bytes | None:
+    uploader = _write_behind_for(uri)
+    return uploader.peek(uri) if uploader is not None else None
+
+
+def _settle(uri: str) -> None:
+    """Wait for a queued upload of `uri` before touching it directly."""
+    uploader = _write_behind_for(uri)
+    if uploader is not None:
+        uploader.wait(uri)
 
 
 # =============================================================================
 # Hashing
 # =============================================================================
 
+class _HashSink:
+    """Write-only file object that feeds everything written into a hasher."""
+
+    closed = False
+
+    def __init__(self, hasher):
+        self._hasher = hasher
+
+    def write(self, data) -> int:
+        self._hasher.update(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+def _content_hasher():
+    """xxh3-128 when xxhash is installed, blake2b-128 otherwise."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+class BatchHasher:
+    """Incremental content hash over record batches.
+
+    Each batch is serialized as Arrow IPC straight into the hasher, i.e. the
+    schema plus every column's validity bitmap, offsets and data buffers,
+    with slicing normalized and padding zeroed. Nothing is buffered.
+
+    The digest depends on batch boundaries; data_hash() normalizes them
+    for tables, streams hash as they are chunked.
+    """
+
+    def __init__(self, schema: pa.Schema):
+        self._hasher = _content_hasher()
+        self._writer = pa.ipc.new_stream(_HashSink(self._hasher), schema)
+        self._digest = None
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        self._writer.write_batch(batch)
+
+    def hexdigest(self) -> str:
+        if self._digest is None:
+            self._writer.close()
+            self._digest = self._hasher.hexdigest()[:16]
+        return self._digest
+
+
+_HASH_WINDOW_ROWS = 65_536
+
+
 def data_hash(table: pa.Table) -> str:
-    """Fast hash based on row count + schema. Use with state to detect changes."""
-    h = hashlib.md5()
-    h.update(f"{len(table)}".encode())
-    h.update(str(table.schema).encode())
-    return h.hexdigest()[:16]
+    """Content fingerprint of a table: schema plus every value.
+
+    Chunking-independent — two tables with equal schema and equal values
+    hash the same however they were built. Use with state to detect
+    changes; delta.py uses it to skip no-op writes.
+
+    Rows are hashed in fixed windows of _HASH_WINDOW_ROWS, each combined
+    into one batch, so only one window is ever copied (not the table).
+    """
+    hasher = BatchHasher(table.schema)
+    for start in range(0, table.num_rows, _HASH_WINDOW_ROWS):
+        for batch in table.slice(start, _HASH_WINDOW_ROWS).combine_chunks().to_batches():
+            hasher.update(batch)
+    return hasher.hexdigest()
+
+
+def hashing_reader(reader: pa.RecordBatchReader) -> tuple[pa.RecordBatchReader, BatchHasher]:
+    """Tee a RecordBatchReader through a BatchHasher.
+
+    Returns a reader yielding the same batches and the hasher; its
+    hexdigest() is final once the returned reader is exhausted.
+    """
+    hasher = BatchHasher(reader.schema)
+
+    def batches():
+        for batch in reader:
+            hasher.update(batch)
+            yield batch
+
+    return pa.RecordBatchReader.from_batches(reader.schema, batches()), hasher
 
 
 def raw_parquet_hash(asset_id: str) -> str | None:
     """Hash a raw parquet by footer metadata only — no data scan.
 
     Reads the parquet footer (rowcount + Arrow schema) via fsspec and returns
-    a hash equivalent to data_hash(load_raw_parquet(asset_id)) without loading
-    the data. Returns None if the file doesn't exist.
+    a cheap shape fingerprint without loading the data. Not comparable with
+    data_hash(), which hashes content. Returns None if the file doesn't exist.
 
     Use in transform nodes to short-circuit before loading GBs into memory
     when the raw file hasn't changed since last run.
     """
     uri = raw_uri(asset_id, "parquet")
+    _settle(uri)
     fs = get_fs(uri)
 
     def _hash_from(pf: pq.ParquetFile) -> str:
@@ -136,19 +417,154 @@ def raw_parquet_hash(asset_id: str) -> str | None:
 # Subsets (published Delta tables)
 # =============================================================================
 
-def load_asset(asset_name: str) -> pa.Table:
-    """Load a published Delta table by name."""
-    from .tracking import record_read
+def _asset_dataset(asset_name: str, version: int | None, as_of):
+    """pyarrow Dataset over a published table, at a version/time if given.
+
+    Fragments carry the Delta file stats as guarantees, so filters prune
+    whole files before any Parquet is read (then row groups by footer
+    stats). Time travel opens a separate handle so the cached one stays
+    at the latest version.
+    """
+    from .delta import _open_table
+    from deltalake import DeltaTable
+    if version is not None and as_of is not None:
+        raise ValueError("Pass either version or as_of, not both")
     uri = subsets_uri(asset_name)
     opts = get_storage_options() if uri.startswith("s3://") else None
     try:
-        table = DeltaTable(uri, storage_options=opts).to_pyarrow_table()
+        if version is None and as_of is None:
+            dt = _open_table(uri, opts)
+        else:
+            dt = DeltaTable(uri, version=version, storage_options=opts)
     except Exception as e:
         raise FileNotFoundError(f"No Delta table found at {uri}") from e
+    if as_of is not None:
+        dt.load_as_version(as_of)
+    return dt.to_pyarrow_dataset()
+
+
+def _filter_expression(filter):
+    """Accept a pyarrow Expression or DNF tuples like [("date", ">=", "2020-01-01")]."""
+    if filter is None or isinstance(filter, pc.Expression):
+        return filter
+    return pq.filters_to_expression(filter)
+
+
+def load_asset(
+    asset_name: str,
+    columns: list[str] | None = None,
+    filter=None,
+    version: int | None = None,
+    as_of: datetime | str | None = None,
+) -> pa.Table:
+    """Load a published Delta table by name.
+
+    Args:
+        asset_name: Published table name.
+        columns: Columns to read (default all). Others are never fetched.
+        filter: Row filter — a pyarrow.compute Expression
+            (pc.field("date") >= "2020-01-01") or DNF tuples
+            ([("date", ">=", "2020-01-01")]). Pushed down to file and
+            row-group statistics.
+        version: Read this table version instead of the latest.
+        as_of: Read the version current at this datetime / ISO string.
+            Exclusive with `version` (ValueError if both are given).
+    """
+    from .tracking import record_read
+    dataset = _asset_dataset(asset_name, version, as_of)
+    table = dataset.to_table(columns=columns, filter=_filter_expression(filter))
     record_read(f"subsets/{asset_name}")
     return table
 
 
+def load_asset_batches(
+    asset_name: str,
+    columns: list[str] | None = None,
+    filter=None,
+    version: int | None = None,
+    as_of: datetime | str | None = None,
+    batch_size: int = 131_072,
+) -> Iterator[pa.RecordBatch]:
+    """load_asset() as a stream of record batches, for tables too big to
+    hold in memory. Same arguments; at most `batch_size` rows per batch."""
+    from .tracking import record_read
+    dataset = _asset_dataset(asset_name, version, as_of)
+    record_read(f"subsets/{asset_name}")
+    yield from dataset.to_batches(columns=columns, filter=_filter_expression(filter), batch_size=batch_size)
+
+
+# Metadata columns the change data feed adds to every row
+_CDF_COLUMNS = ("_change_type", "_commit_version", "_commit_timestamp")
+
+
+def load_changes(
+    asset_name: str,
+    since_version: int,
+    until_version: int | None = None,
+    *,
+    columns: list[str] | None = None,
+    include_deletes: bool = False,
+) -> pa.Table:
+    """Rows inserted or updated in a published table after a version.
+
+    Reads the Delta change data feed (enable it with change_data_feed=True
+    on merge/overwrite/append) instead of the whole table. Pass the
+    version you last synced — e.g. a materialization version from
+    run.json — and get the changes committed since, up to and including
+    `until_version` (default: latest).
+
+    A row changed in several commits appears once per commit; keep the
+    one with the highest _commit_version.
+
+    Args:
+        asset_name: Published table name.
+        since_version: Last version already seen (exclusive).
+        until_version: Last version to include (inclusive), None for latest.
+        columns: Data columns to return (default all).
+        include_deletes: Also return deleted rows (_change_type "delete").
+
+    Returns:
+        Table of data columns plus _change_type ("insert" /
+        "update_postimage" [/ "delete"]) and _commit_version. Empty when
+        nothing changed.
+
+    Raises:
+        FileNotFoundError: the table doesn't exist.
+        ValueError: change data feed wasn't enabled for part of the range.
+    """
+    from .tracking import record_read
+    from .delta import _open_table
+    uri = subsets_uri(asset_name)
+    opts = get_storage_options() if uri.startswith("s3://") else None
+    try:
+        dt = _open_table(uri, opts)
+    except Exception as e:
+        raise FileNotFoundError(f"No Delta table found at {uri}") from e
+
+    change_types = ["insert", "update_postimage"] + (["delete"] if include_deletes else [])
+    meta_columns = ["_change_type", "_commit_version"]
+    try:
+        reader = dt.load_cdf(
+            starting_version=since_version + 1,
+            ending_version=until_version,
+            columns=columns + meta_columns if columns else None,
+            allow_out_of_range=True,
+        )
+    except Exception as e:
+        if "change data" in str(e).lower():
+            raise ValueError(
+                f"{asset_name}: change data feed not enabled for versions "
+                f"{since_version + 1}..{until_version if until_version is not None else 'latest'}"
+            ) from e
+        raise
+    # deltalake returns an arro3 reader; bridge to pyarrow.
+    table = pa.table(reader.read_all())
+    table = table.filter(pc.is_in(table["_change_type"], pa.array(change_types)))
+    keep = (columns or [c for c in table.column_names if c not in _CDF_COLUMNS]) + meta_columns
+    record_read(f"subsets/{asset_name}")
+    return table.select(keep).sort_by("_commit_version")
+
+
 # =============================================================================
 # State files (small JSON, per-asset)
 # =============================================================================
@@ -163,38 +579,184 @@ def load_state(asset: str) -> dict:
 
 
 def save_state(asset: str, state_data: dict) -> str:
-    """Save state for an asset. Returns the URI."""
-    import os
-    old_state = load_state(asset)
-    state_data = {
-        **state_data,
-        "_metadata": {
-            "updated_at": datetime.now().isoformat(),
-            "run_id": os.environ.get("RUN_ID", "unknown"),
-        },
-    }
+    """Save state for an asset. Returns the URI.
+
+    Replaces the whole state; a cached state() handle for the asset is
+    dropped so its next use re-reads.
+    """
+    old_state = load_state(asset) if debug._is_logging_enabled() else {}
+    state_data = {**state_data, "_metadata": _state_metadata()}
     uri = state_uri(asset)
-    _write_bytes(uri, json.dumps(state_data, indent=2).encode("utf-8"))
+    _write_bytes_atomic(uri, json.dumps(state_data, indent=2).encode("utf-8"))
     debug.log_state_change(asset, old_state, state_data)
+    with _states_lock:
+        _states.pop(asset, None)
     return uri
 
 
+def _state_metadata() -> dict:
+    return {
+        "updated_at": datetime.now().isoformat(),
+        "run_id": os.environ.get("RUN_ID", "unknown"),
+    }
+
+
+# =============================================================================
+# State handles — read once, flush only what changed
+#
+#     with state("series_data") as s:
+#         s["series_states"] = series_states
+#         s.flush()                 # checkpoint mid-run
+#
+# A handle reads the state once and is cached per process, so repeated
+# state("x") calls share it. Assignments mark keys dirty; values mutated
+# in place need s.touch(key) (or re-assigning the key). flush() compares
+# each dirty key's JSON against the last flushed copy, writes only if
+# something really changed, with a compact encoding, atomically. The
+# debug state-change log diffs against that copy instead of re-reading
+# storage. Leaving the `with` block flushes, unless it raised.
+# =============================================================================
+
+class StateHandle(MutableMapping):
+    """Cached, dirty-tracked view of one state asset. See state()."""
+
+    def __init__(self, asset: str):
+        self.asset = asset
+        self._lock = threading.RLock()
+        data = load_state(asset)
+        data.pop("_metadata", None)
+        self._data = data
+        # Digest of each key's encoded value as last read/flushed, for
+        # change detection without keeping a second copy of the state
+        self._digests = {k: self._digest(self._encode(v)) for k, v in data.items()}
+        self._dirty: set[str] = set()
+
+    @staticmethod
+    def _encode(value) -> str:
+        return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+    @staticmethod
+    def _digest(encoded: str) -> bytes:
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).digest()
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._dirty.add(key)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self._data[key]
+            self._dirty.add(key)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def touch(self, *keys: str) -> None:
+        """Mark keys dirty after mutating their values in place."""
+        with self._lock:
+            self._dirty.update(keys)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def flush(self) -> bool:
+        """Write the state if a dirty key changed. Returns True if written."""
+        with self._lock:
+            # Each value is encoded once: dirty keys for the comparison,
+            # and the payload is assembled from those plus the clean keys
+            encoded = {k: self._encode(self._data[k]) for k in self._dirty if k in self._data}
+            changed = {}
+            for key in self._dirty:
+                digest = self._digest(encoded[key]) if key in encoded else None
+                if digest != self._digests.get(key):
+                    changed[key] = digest
+            self._dirty.clear()
+            if not changed:
+                return False
+
+            parts = [
+                f"{json.dumps(k)}:{encoded[k] if k in encoded else self._encode(v)}"
+                for k, v in self._data.items()
+            ]
+            parts.append(f'"_metadata":{json.dumps(_state_metadata(), separators=(",", ":"))}')
+            old_state = load_state(self.asset) if debug._is_logging_enabled() else {}
+            _write_bytes_atomic(state_uri(self.asset), ("{" + ",".join(parts) + "}").encode("utf-8"))
+            old = {k: old_state[k] for k in changed if k in old_state}
+            new = {k: self._data[k] for k in changed if k in self._data}
+            debug.log_state_change(self.asset, old, new)
+            for key, digest in changed.items():
+                if digest is None:
+                    self._digests.pop(key, None)
+                else:
+                    self._digests[key] = digest
+            return True
+
+    def __enter__(self) -> "StateHandle":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+
+_states: dict[str, StateHandle] = {}
+_states_lock = threading.Lock()
+
+
+def state(asset: str) -> StateHandle:
+    """Cached state handle for an asset (see StateHandle)."""
+    with _states_lock:
+        handle = _states.get(asset)
+        if handle is None:
+            handle = _states[asset] = StateHandle(asset)
+        return handle
+
+
 # =============================================================================
 # Raw files (text/binary blobs — CSV, XML, ZIP, etc.)
 # =============================================================================
 
-def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt") -> str:
-    """Save a raw file. Accepts str or bytes."""
+def save_raw_file(
+    content: str | bytes,
+    asset_id: str,
+    extension: str = "txt",
+    *,
+    codec: str | None = None,
+    level: int | None = None,
+    dictionary: str | None = None,
+) -> str:
+    """Save a raw file. Accepts str or bytes.
+
+    Args:
+        codec: "gzip" or "zstd" to store compressed (same extension;
+            read back with load_raw_file(decompress=True)).
+        level: Compression level (default RAW_ZSTD_LEVEL / RAW_GZIP_LEVEL).
+        dictionary: Name of a zstd dictionary from train_raw_dictionary().
+            Implies codec="zstd".
+    """
     from .tracking import record_write
     data = content.encode("utf-8") if isinstance(content, str) else content
+    data = _encode(data, codec, level, dictionary)
     uri = raw_uri(asset_id, extension)
+    _manifest_open()
     _write_bytes(uri, data)
+    _manifest_record(asset_id, extension, data)
     print(f"  -> Saved {asset_id}.{extension}")
     record_write(f"raw/{asset_id}.{extension}")
     return uri
 
 
-def load_raw_file(asset_id: str, extension: str = "txt", *, binary: bool = False) -> str | bytes:
+def load_raw_file(
+    asset_id: str, extension: str = "txt", *, binary: bool = False, decompress: bool = False
+) -> str | bytes:
     """Load a raw file.
 
     Args:
@@ -205,6 +767,9 @@ def load_raw_file(asset_id: str, extension: str = "txt", *, binary: bool = False
             Set binary=True for xlsx/zip/parquet or any file where you
             need deterministic bytes — the decode fallback is unreliable
             when a binary payload happens to be ASCII-only.
+        decompress: Decompress gzip/zstd payloads (detected by magic
+            bytes), for assets saved with codec=. False (default) returns
+            the stored bytes, e.g. a downloaded .gz.
     """
     from .tracking import record_read
     uri = raw_uri(asset_id, extension)
@@ -212,6 +777,8 @@ def load_raw_file(asset_id: str, extension: str = "txt", *, binary: bool = False
     if data is None:
         raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found at {uri}")
     record_read(f"raw/{asset_id}.{extension}")
+    if decompress:
+        data = _decode(data)
     if binary:
         return data
     try:
@@ -224,47 +791,410 @@ def load_raw_file(asset_id: str, extension: str = "txt", *, binary: bool = False
 # Raw JSON (with optional gzip compression)
 # =============================================================================
 
-def save_raw_json(data, asset_id: str, compress: bool = False) -> str:
-    """Save raw JSON data, optionally gzip-compressed."""
+def _check_compress(compress: bool, codec: str | None, dictionary: str | None = None) -> None:
+    """compress=True means the legacy .gz extension with gzip; refuse a
+    codec/dictionary it would otherwise silently override."""
+    if compress and (codec is not None or dictionary is not None):
+        raise ValueError("Pass either compress=True (legacy .gz) or codec=/dictionary=, not both")
+
+
+def save_raw_json(
+    data,
+    asset_id: str,
+    compress: bool = False,
+    *,
+    codec: str | None = None,
+    level: int | None = None,
+    dictionary: str | None = None,
+) -> str:
+    """Save raw JSON data, optionally compressed.
+
+    compress=True writes gzip to <asset_id>.json.gz, as before. codec /
+    level / dictionary (see save_raw_file) write <asset_id>.json with a
+    compressed payload that load_raw_json() detects. Giving both raises
+    ValueError.
+    """
     from .tracking import record_write
+    _check_compress(compress, codec, dictionary)
     if compress:
         ext = "json.gz"
-        buf = io.BytesIO()
-        with gzip.GzipFile(fileobj=buf, mode="wb") as gz:
-            gz.write(json.dumps(data).encode("utf-8"))
-        content = buf.getvalue()
+        content = _encode(json.dumps(data).encode("utf-8"), "gzip", level, None)
+    elif codec is not None or dictionary is not None:
+        ext = "json"
+        content = _encode(json.dumps(data).encode("utf-8"), codec, level, dictionary)
     else:
         ext = "json"
         content = json.dumps(data, indent=2).encode("utf-8")
     uri = raw_uri(asset_id, ext)
+    _manifest_open()
     _write_bytes(uri, content)
+    _manifest_record(asset_id, ext, content)
     print(f"  -> Saved {asset_id}.{ext}")
     record_write(f"raw/{asset_id}.{ext}")
     return uri
 
 
 def load_raw_json(asset_id: str):
-    """Load raw JSON. Auto-detects compression (tries .json then .json.gz)."""
+    """Load raw JSON. Tries .json then legacy .json.gz; compression is
+    detected from the payload."""
     from .tracking import record_read
-    for ext in ("json", "json.gz"):
+    extensions = ("json", "json.gz")
+    if _manifest.active():
+        # The manifest's extension first. A miss is final unless another
+        # writer was open when it loaded; then both are probed
+        ext = _manifest_extension(asset_id, extensions)
+        if ext is not None:
+            extensions = (ext,) + tuple(e for e in extensions if e != ext)
+        elif _manifest.authoritative():
+            extensions = ()
+    for ext in extensions:
         uri = raw_uri(asset_id, ext)
         data = _read_with_mirror_fallback(uri, mirror_raw_path(asset_id, ext))
         if data is None:
             continue
         record_read(f"raw/{asset_id}.{ext}")
-        if ext == "json.gz":
-            with gzip.GzipFile(fileobj=io.BytesIO(data), mode="rb") as gz:
-                return json.load(gz)
-        return json.loads(data.decode("utf-8"))
+        return _decode_json(data)
     raise FileNotFoundError(f"Raw JSON asset '{asset_id}' not found.")
 
 
+def _decode_json(data: bytes):
+    return json.loads(_decode(data).decode("utf-8"))
+
+
+# =============================================================================
+# Raw compression — codecs and zstd dictionaries (see compression.py)
+#
+# Dictionaries are raw assets: _zstd_dicts/<name>.zdict is the current one
+# for writers, _zstd_dicts/<dict_id>.zdict keeps every trained version
+# readable by the ID stored in each frame. Both are cached per process.
+# =============================================================================
+
+_DICT_PREFIX = "_zstd_dicts"
+_dictionaries: dict[str, bytes] = {}
+
+
+def _dictionary_bytes(key: str) -> bytes:
+    data = _dictionaries.get(key)
+    if data is None:
+        uri = raw_uri(f"{_DICT_PREFIX}/{key}", "zdict")
+        data = _read_with_mirror_fallback(uri, mirror_raw_path(f"{_DICT_PREFIX}/{key}", "zdict"))
+        if data is None:
+            raise FileNotFoundError(f"zstd dictionary '{key}' not found at {uri}")
+        _dictionaries[key] = data
+    return data
+
+
+def _dictionary_by_id(dict_id: int) -> bytes:
+    return _dictionary_bytes(str(dict_id))
+
+
+def _encode(data: bytes, codec: str | None, level: int | None, dictionary: str | None) -> bytes:
+    if dictionary is not None:
+        codec = codec or "zstd"
+    if codec is None:
+        return data
+    return codecs.compress(data, codec, level, _dictionary_bytes(dictionary) if dictionary else None)
+
+
+def _decode(data: bytes) -> bytes:
+    return codecs.decompress(data, _dictionary_by_id)
+
+
+def train_raw_dictionary(name: str, samples, size: int = 112_640) -> int:
+    """Train a zstd dictionary for many small, similar raw assets.
+
+    Args:
+        name: Dictionary name, passed later as `dictionary=` to save_raw_*.
+        samples: Example payloads (str or bytes) — a few hundred files
+            like the ones it will compress.
+        size: Dictionary size in bytes (zstd's default 112 KB).
+
+    Returns:
+        The dictionary ID. Retraining under the same name keeps assets
+        written with earlier versions readable. Needs `zstandard`.
+    """
+    samples = [s.encode("utf-8") if isinstance(s, str) else s for s in samples]
+    dict_id, data = codecs.train_dictionary(samples, size)
+    for key in (str(dict_id), name):
+        save_raw_file(data, f"{_DICT_PREFIX}/{key}", "zdict")
+        _dictionaries[key] = data
+    return dict_id
+
+
+# =============================================================================
+# Bulk raw I/O — many small assets per round trip
+#
+# load_raw_many()/save_raw_many() hand whole batches to fsspec's cat/pipe,
+# which s3fs runs as concurrent requests, so per-object latency overlaps
+# instead of adding up. With the disk cache on, reads go through it on a
+# thread pool instead (each one validates its own entry). Results are
+# yielded batch by batch, so callers can start on the first objects while
+# later ones are in flight and never hold more than a batch of raw bytes.
+#
+# RAW_IO_CONCURRENCY: objects per batch / concurrent requests (default 32)
+# =============================================================================
+
+def _raw_io_concurrency() -> int:
+    return max(1, int(os.environ.get("RAW_IO_CONCURRENCY", "32")))
+
+
+def _fetch_batch(uris: list[str]) -> dict[str, bytes]:
+    """{uri: bytes} for the URIs that exist."""
+    queued = {u: data for u in uris if (data := _queued_bytes(u)) is not None}
+    uris = [u for u in uris if u not in queued]
+    if not uris:
+        return queued
+    fs = get_fs(uris[0])
+    cache = cache_for(uris[0])
+    if cache is not None:
+        # Each read runs in a copy of the caller's context, so cache
+        # metrics land on the calling task
+        with ThreadPoolExecutor(max_workers=len(uris)) as pool:
+            futures = [pool.submit(contextvars.copy_context().run, cache.read, u, fs) for u in uris]
+            results = [f.result() for f in futures]
+        return {**queued, **{u: data for u, data in zip(uris, results) if data is not None}}
+    kwargs = {"batch_size": len(uris)} if uris[0].startswith("s3://") else {}
+    found = fs.cat(uris, on_error="omit", **kwargs)
+    # fsspec may return keys without the protocol; map back to ours
+    by_path = {fs._strip_protocol(u): u for u in uris}
+    return {**queued, **{by_path.get(fs._strip_protocol(k), k): v for k, v in found.items()}}
+
+
+def load_raw_many(
+    asset_ids, extension: str = "json", *, decompress: bool = False
+) -> Iterator[tuple[str, object]]:
+    """Load many raw assets concurrently. Yields (asset_id, content).
+
+    Content is parsed for "json" (falling back per asset to .json.gz, as
+    load_raw_json does) and bytes for any other extension, decompressed
+    only with decompress=True (as load_raw_file); None when the asset
+    doesn't exist. Honors the SSD mirror fallback in dev mode.
+    Yields batch by batch, not in input order.
+    """
+    from .tracking import record_read
+    asset_ids = list(asset_ids)
+    size = _raw_io_concurrency()
+    for start in range(0, len(asset_ids), size):
+        batch = asset_ids[start:start + size]
+        uris = {asset_id: raw_uri(asset_id, extension) for asset_id in batch}
+        found = _fetch_batch(list(uris.values()))
+        for asset_id, uri in uris.items():
+            data = found.get(uri)
+            if data is None and not uri.startswith("s3://"):
+                mirror = mirror_raw_path(asset_id, extension)
+                if mirror is not None and mirror.exists():
+                    data = mirror.read_bytes()
+            if data is None:
+                if extension == "json":
+                    try:
+                        yield asset_id, load_raw_json(asset_id)
+                        continue
+                    except FileNotFoundError:
+                        pass
+                yield asset_id, None
+                continue
+            record_read(f"raw/{asset_id}.{extension}")
+            if extension in ("json", "json.gz"):
+                yield asset_id, _decode_json(data)
+            else:
+                yield asset_id, _decode(data) if decompress else data
+
+
+def save_raw_many(
+    items,
+    extension: str = "json",
+    *,
+    codec: str | None = None,
+    level: int | None = None,
+    dictionary: str | None = None,
+) -> list[str]:
+    """Save many raw assets concurrently.
+
+    Args:
+        items: {asset_id: content} or iterable of (asset_id, content).
+            For "json" content is serialized as save_raw_json() does;
+            otherwise str (UTF-8) or bytes.
+        extension: File extension for every asset.
+        codec, level, dictionary: Compression, as for save_raw_file().
+            A dictionary pays off most here: many small, similar files.
+
+    Returns:
+        URIs written, in input order.
+    """
+    from .tracking import record_write
+    pairs = list(items.items() if isinstance(items, dict) else items)
+    written = []
+    size = _raw_io_concurrency()
+    for start in range(0, len(pairs), size):
+        payload = {}
+        for asset_id, content in pairs[start:start + size]:
+            if extension == "json":
+                compact = codec is not None or dictionary is not None
+                content = json.dumps(content, indent=None if compact else 2)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            payload[raw_uri(asset_id, extension)] = _encode(content, codec, level, dictionary)
+        uris = list(payload)
+        for uri in uris:
+            _settle(uri)
+        fs = get_fs(uris[0])
+        _manifest_open()
+        if uris[0].startswith("s3://"):
+            fs.pipe(payload, batch_size=len(payload))
+        else:
+            fs.pipe(payload)
+        cache = cache_for(uris[0])
+        for uri in uris:
+            # No write-through here (it costs a HEAD per object); the
+            # stale entry is dropped and the next read refetches.
+            if cache is not None:
+                cache.discard(uri)
+        for asset_id, _ in pairs[start:start + size]:
+            _manifest_record(asset_id, extension, payload[raw_uri(asset_id, extension)])
+            record_write(f"raw/{asset_id}.{extension}")
+        written.extend(uris)
+    print(f"  -> Saved {len(written)} {extension} assets")
+    return written
+
+
+# =============================================================================
+# Raw NDJSON — one record per line, streamed
+#
+# save_raw_json() serializes the whole object (indented) in one go and
+# load_raw_json() parses it back whole. NDJSON is written and read a
+# record at a time through raw_writer()/raw_reader(), so memory is one
+# record regardless of file size. Records go through orjson when it is
+# installed and stdlib json otherwise, or for anything orjson rejects
+# (non-str keys on write, NaN literals on read). orjson writes NaN as null.
+# =============================================================================
+
+_NDJSON_EXTENSIONS = (("ndjson", None), ("ndjson.gz", "gzip"))
+_LEGACY_JSON_EXTENSIONS = ("json", "json.gz")
+
+
+def _dumps_line(record) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(record) + b"\n"
+        except TypeError:
+            pass
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _loads_line(line: bytes):
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(line)
+
+
+class NdjsonWriter:
+    """Record-at-a-time writer yielded by raw_ndjson_writer()."""
+
+    def __init__(self, f):
+        self._f = f
+        self.records = 0
+
+    def write(self, record) -> None:
+        self._f.write(_dumps_line(record))
+        self.records += 1
+
+    def write_many(self, records) -> None:
+        for record in records:
+            self.write(record)
+
+
+@contextmanager
+def raw_ndjson_writer(
+    asset_id: str, *, compress: bool = False, codec: str | None = None, level: int | None = None
+):
+    """Streaming NDJSON writer yielding an NdjsonWriter.
+
+    compress=True writes gzip to .ndjson.gz; `codec` ("gzip"/"zstd", at
+    `level`) compresses .ndjson in place, detected again on read. Giving
+    both raises ValueError.
+
+    Example:
+        with raw_ndjson_writer("items", compress=True) as w:
+            for item in fetch_items():
+                w.write(item)
+    """
+    _check_compress(compress, codec)
+    ext, compression = _NDJSON_EXTENSIONS[1] if compress else _NDJSON_EXTENSIONS[0]
+    with raw_writer(asset_id, ext, compression=compression or codec, level=level) as f:
+        yield NdjsonWriter(f)
+
+
+def save_raw_ndjson(
+    records, asset_id: str, compress: bool = False, *, codec: str | None = None, level: int | None = None
+) -> str:
+    """Save an iterable of records as NDJSON without materializing it."""
+    with raw_ndjson_writer(asset_id, compress=compress, codec=codec, level=level) as w:
+        w.write_many(records)
+    return raw_uri(asset_id, "ndjson.gz" if compress else "ndjson")
+
+
+def _raw_exists_any(asset_id: str, ext: str) -> bool:
+    """Exists at its URI, or (dev mode) in the SSD mirror."""
+    if _manifest.active():
+        if _manifest_entry(asset_id, ext) is not None:
+            return True
+        if _manifest.authoritative():
+            return False
+    uri = raw_uri(asset_id, ext)
+    if _exists(uri):
+        return True
+    if uri.startswith("s3://"):
+        return False
+    mirror = mirror_raw_path(asset_id, ext)
+    return mirror is not None and mirror.exists()
+
+
+def iter_raw_ndjson(asset_id: str) -> Iterator:
+    """Iterate the records of a raw NDJSON asset, one at a time.
+
+    Auto-detects .ndjson / .ndjson.gz, then falls back to a legacy
+    .json / .json.gz asset (loaded whole; a top-level list yields its
+    items, anything else is a single record), so readers can switch
+    before the writers do.
+    """
+    for ext, _ in _NDJSON_EXTENSIONS:
+        if not _raw_exists_any(asset_id, ext):
+            continue
+        # NDJSON text can't start with a codec's magic bytes
+        with raw_reader(asset_id, ext, compression="detect") as f:
+            for line in f:
+                if line.strip():
+                    yield _loads_line(line)
+        return
+
+    for ext in _LEGACY_JSON_EXTENSIONS:
+        if _raw_exists_any(asset_id, ext):
+            data = load_raw_json(asset_id)
+            if isinstance(data, list):
+                yield from data
+            else:
+                yield data
+            return
+    raise FileNotFoundError(f"Raw NDJSON asset '{asset_id}' not found.")
+
+
+def load_raw_ndjson(asset_id: str) -> list:
+    """All records of a raw NDJSON (or legacy JSON) asset as a list."""
+    return list(iter_raw_ndjson(asset_id))
+
+
 def delete_raw_file(asset_id: str, extension: str = "parquet") -> None:
     """Delete a raw asset by (asset_id, extension). No-op if absent.
 
     Symmetric with `save_raw_*` — addresses by id, works in cloud + dev.
     """
+    _manifest_open()
     _delete(raw_uri(asset_id, extension))
+    if _manifest.active():
+        _manifest.discard(f"{asset_id}.{extension}")
 
 
 # =============================================================================
@@ -279,21 +1209,71 @@ def save_raw_parquet(data: pa.Table, asset_id: str) -> str:
     buf = io.BytesIO()
     pq.write_table(data, buf, compression="snappy")
     uri = raw_uri(asset_id, "parquet")
-    _write_bytes(uri, buf.getvalue())
+    content = buf.getvalue()
+    _manifest_open()
+    _write_bytes(uri, content)
+    _manifest_record(asset_id, "parquet", content)
     print(f"  -> Saved {asset_id}.parquet ({data.num_rows:,} rows)")
     record_write(f"raw/{asset_id}.parquet")
     return uri
 
 
-def load_raw_parquet(asset_id: str) -> pa.Table:
-    """Load a Parquet file as PyArrow table."""
+def _raw_read_target(asset_id: str, ext: str):
+    """(pyarrow filesystem, path) to read a raw asset from, or None.
+
+    Local paths (and the SSD mirror fallback) map to the local filesystem,
+    so callers can memory-map them. s3:// is served from the disk cache
+    when enabled, else read through Arrow's native S3 client.
+    """
+    uri = raw_uri(asset_id, ext)
+    _settle(uri)
+    cache = cache_for(uri)
+    if cache is not None:
+        local = cache.path(uri, get_fs(uri))
+        return get_arrow_fs(local) if local is not None else None
+    if uri.startswith("s3://"):
+        fs, path = get_arrow_fs(uri)
+        return (fs, path) if fs.get_file_info(path).is_file else None
+    if Path(uri).exists():
+        return get_arrow_fs(uri)
+    mirror = mirror_raw_path(asset_id, ext)
+    if mirror is not None and mirror.exists():
+        return get_arrow_fs(str(mirror))
+    return None
+
+
+def load_raw_parquet(asset_id: str, columns: list[str] | None = None, filters=None) -> pa.Table:
+    """Load a Parquet file as PyArrow table.
+
+    Local files are memory-mapped and s3:// is read through Arrow's S3
+    client, so the file is never copied into a Python bytes object —
+    peak memory is about the decoded table. `columns` reads only those;
+    `filters` (pyarrow.parquet filter syntax, e.g. [("year", ">=", 2020)])
+    skips row groups whose statistics rule them out. A selective read of
+    a remote file that isn't already in the disk cache goes through
+    raw_parquet_file(), fetching only the footer and the byte ranges of
+    the columns/row groups it needs instead of downloading the file.
+    """
     from .tracking import record_read
-    uri = raw_uri(asset_id, "parquet")
-    data = _read_with_mirror_fallback(uri, mirror_raw_path(asset_id, "parquet"))
-    if data is None:
-        raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {uri}")
+    if columns is not None or filters is not None:
+        uri = raw_uri(asset_id, "parquet")
+        _settle(uri)
+        fs = get_fs(uri)
+        cache = cache_for(uri)
+        # Not cached: range-read the remote (the peek already ruled out a local copy)
+        if cache is not None and cache.peek(uri, fs) is None:
+            with _open_remote_parquet(asset_id, uri, fs) as source:
+                table = pq.read_table(source, columns=columns, filters=filters)
+            record_read(f"raw/{asset_id}.parquet")
+            return table
+
+    target = _raw_read_target(asset_id, "parquet")
+    if target is None:
+        raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {raw_uri(asset_id, 'parquet')}")
+    fs, path = target
+    table = pq.read_table(path, columns=columns, filters=filters, filesystem=fs)
     record_read(f"raw/{asset_id}.parquet")
-    return pq.read_table(io.BytesIO(data))
+    return table
 
 
 @contextmanager
@@ -302,20 +1282,26 @@ def raw_parquet_localpath(asset_id: str):
 
     In dev mode: yields the dev path directly (or SSD mirror fallback) —
     no copy.
-    In cloud mode: streams the remote parquet to a tempfile and yields
-    that path; the file is deleted on exit.
+    In cloud mode: yields the disk cache's copy (see cache.py), or with
+    the cache disabled streams the remote parquet to a tempfile and
+    yields that path; the file is deleted on exit.
 
     Use this when you need a file path for tools like DuckDB that read
     parquet by path rather than loading bytes into memory. The compressed
     parquet on disk is typically 5-10× smaller than its decompressed
     Arrow representation, so streaming queries against the path stay
     memory-bounded even when load_raw_parquet() would OOM.
+
+    A local path means downloading the whole file first. For selective
+    reads of remote parquet use raw_parquet_file() (range reads) or
+    subsets_utils.duckdb.raw(), which DuckDB reads from S3 by range.
     """
     from .tracking import record_read
     import tempfile
     import os as _os
 
     uri = raw_uri(asset_id, "parquet")
+    _settle(uri)
     record_read(f"raw/{asset_id}.parquet")
 
     if not uri.startswith("s3://"):
@@ -330,6 +1316,14 @@ def raw_parquet_localpath(asset_id: str):
         raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {uri}")
 
     fs = get_fs(uri)
+    cache = cache_for(uri)
+    if cache is not None:
+        local = cache.path(uri, fs)
+        if local is None:
+            raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {uri}")
+        yield local
+        return
+
     tmp = tempfile.NamedTemporaryFile(
         suffix=f".{asset_id}.parquet", delete=False
     )
@@ -349,6 +1343,120 @@ def raw_parquet_localpath(asset_id: str):
             pass
 
 
+def _parquet_block_size() -> int:
+    return int(os.environ.get("RAW_PARQUET_BLOCK_SIZE", 2 * 1024 * 1024))
+
+
+@contextmanager
+def _raw_parquet_source(asset_id: str, block_size: int | None = None):
+    """Random-access file for a raw parquet: memory-mapped when local or
+    in the disk cache, else a block-caching range reader on the remote."""
+    uri = raw_uri(asset_id, "parquet")
+    _settle(uri)
+    fs = get_fs(uri)
+    cache = cache_for(uri)
+    local = cache.peek(uri, fs) if cache is not None else None
+    if local is None and "://" not in uri:
+        target = _raw_read_target(asset_id, "parquet")
+        if target is None:
+            raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {uri}")
+        local = target[1]
+
+    if local is not None:
+        afs, path = get_arrow_fs(local)
+        source = afs.open_input_file(path)
+    else:
+        source = _open_remote_parquet(asset_id, uri, fs, block_size)
+    try:
+        yield source
+    finally:
+        source.close()
+
+
+def _open_remote_parquet(asset_id: str, uri: str, fs, block_size: int | None = None):
+    """Block-caching range reader on a remote raw parquet."""
+    try:
+        return fs.open(
+            uri, "rb",
+            block_size=block_size or _parquet_block_size(),
+            cache_type="blockcache",
+        )
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Raw parquet '{asset_id}' not found at {uri}") from None
+
+
+@contextmanager
+def raw_parquet_file(asset_id: str, *, block_size: int | None = None):
+    """Context manager yielding a `pq.ParquetFile` over a raw parquet,
+    read by byte range.
+
+    Local files (and remote ones already in the disk cache) are opened
+    memory-mapped. Remote files are opened through a block-caching fsspec
+    file: the footer is one ranged GET, and each read_row_group() /
+    iter_batches() / read(columns=...) fetches only the blocks holding
+    the requested column chunks. Blocks are `block_size` bytes (env
+    RAW_PARQUET_BLOCK_SIZE, default 2 MB) and are kept for the life of
+    the handle, so re-reading metadata is free.
+
+    Example:
+        with raw_parquet_file("wiki_dump") as pf:
+            for i in range(pf.num_row_groups):
+                if pf.metadata.row_group(i).column(0).statistics.max >= cutoff:
+                    batch = pf.read_row_group(i, columns=["id", "title"])
+    """
+    from .tracking import record_read
+    with _raw_parquet_source(asset_id, block_size) as source:
+        yield pq.ParquetFile(source)
+    record_read(f"raw/{asset_id}.parquet")
+
+
+# =============================================================================
+# Raw Arrow IPC — uncompressed, memory-mappable
+#
+# The Arrow IPC file format is the in-memory layout on disk: a local
+# load_raw_arrow() maps the file and the table's buffers point straight
+# into the page cache — no decode, no copy, pages faulted in on access.
+# Bigger on disk than Parquet; use it for intermediates that are re-read
+# often. Compression (lz4/zstd) shrinks the file but buffers are then
+# decompressed on read, as with Parquet.
+# =============================================================================
+
+def save_raw_arrow(data: pa.Table, asset_id: str, *, compression: str | None = None) -> str:
+    """Save a PyArrow table (or RecordBatchReader) as an Arrow IPC file."""
+    from .tracking import record_write
+    uri = raw_uri(asset_id, "arrow")
+    _settle(uri)
+    fs, path = get_arrow_fs(uri)
+    if not uri.startswith("s3://"):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    rows = 0
+    _manifest_open()
+    with fs.open_output_stream(path) as sink:
+        with pa.ipc.new_file(sink, data.schema, options=options) as writer:
+            batches = data if isinstance(data, pa.RecordBatchReader) else data.to_batches()
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    _manifest_record(asset_id, "arrow", uri=uri)
+    print(f"  -> Saved {asset_id}.arrow ({rows:,} rows)")
+    record_write(f"raw/{asset_id}.arrow")
+    return uri
+
+
+def load_raw_arrow(asset_id: str) -> pa.Table:
+    """Load an Arrow IPC file. Zero-copy (memory-mapped) for local files."""
+    from .tracking import record_read
+    target = _raw_read_target(asset_id, "arrow")
+    if target is None:
+        raise FileNotFoundError(f"Raw arrow '{asset_id}' not found at {raw_uri(asset_id, 'arrow')}")
+    fs, path = target
+    # Local files open memory-mapped (see get_arrow_fs)
+    table = pa.ipc.open_file(fs.open_input_file(path)).read_all()
+    record_read(f"raw/{asset_id}.arrow")
+    return table
+
+
 # =============================================================================
 # Streaming helpers — for datasets too big to fit in memory
 #
@@ -356,6 +1464,21 @@ def raw_parquet_localpath(asset_id: str):
 # parent-dir creation; s3:// URIs stream via multipart upload.
 # =============================================================================
 
+@contextmanager
+def _codec_stream(f, mode: str, encoding: str | None, wrap):
+    """Yield `wrap(f)`, text-wrapped for "t" modes; closes the wrappers
+    (flushing any compressor) but not `f`."""
+    stream = wrap(f)
+    text = io.TextIOWrapper(stream, encoding=encoding) if "t" in mode else None
+    try:
+        yield text if text is not None else stream
+    finally:
+        if text is not None:
+            text.detach()
+        if stream is not f:
+            stream.close()
+
+
 @contextmanager
 def raw_writer(
     asset_id: str,
@@ -364,35 +1487,50 @@ def raw_writer(
     mode: str = "wb",
     compression: str | None = None,
     encoding: str | None = "utf-8",
+    level: int | None = None,
+    dictionary: str | None = None,
 ):
     """Streaming writer for a raw asset. Context manager yielding a file handle.
 
     Use when the content doesn't fit in memory. Writes go through fsspec,
     so s3:// URIs stream via multipart upload and local paths get parent
-    dirs auto-created. Supports native gzip/bz2/xz compression.
+    dirs auto-created.
 
     Args:
         asset_id: Logical asset name (same as save_raw_*).
         extension: File extension (e.g. "ndjson.gz", "csv").
         mode: File mode — "wb" for bytes (default), "wt" for text.
-        compression: "gzip", "bz2", "xz", or None. Matches fsspec.
+        compression: "gzip" or "zstd" (at `level`, optionally with a zstd
+            `dictionary`; see save_raw_file), "bz2", "xz", or None.
         encoding: Text encoding when mode="wt". Ignored for binary.
 
     Example:
         with raw_writer("big_dump", "ndjson.gz", mode="wt", compression="gzip") as f:
             for row in stream:
-                f.write(json.dumps(row) + "\\n")
+                f.write(json.dumps(row) + "\n")
     """
     from .tracking import record_write
     uri = raw_uri(asset_id, extension)
+    _settle(uri)
     fs = get_fs(uri)
-    open_kwargs = {}
-    if "t" in mode:
-        open_kwargs["encoding"] = encoding
-    if compression is not None:
-        open_kwargs["compression"] = compression
-    with fs.open(uri, mode=mode, **open_kwargs) as f:
-        yield f
+    _manifest_open()
+    if compression in codecs.CODECS or dictionary is not None:
+        dict_data = _dictionary_bytes(dictionary) if dictionary else None
+        codec = compression or "zstd"
+        with fs.open(uri, mode="wb") as f:
+            with _codec_stream(
+                f, mode, encoding, lambda raw: codecs.compressing_writer(raw, codec, level, dict_data)
+            ) as stream:
+                yield stream
+    else:
+        open_kwargs = {}
+        if "t" in mode:
+            open_kwargs["encoding"] = encoding
+        if compression is not None:
+            open_kwargs["compression"] = compression
+        with fs.open(uri, mode=mode, **open_kwargs) as f:
+            yield f
+    _manifest_record(asset_id, extension, uri=uri)
     print(f"  -> Saved {asset_id}.{extension}")
     record_write(f"raw/{asset_id}.{extension}")
 
@@ -408,28 +1546,45 @@ def raw_reader(
 ):
     """Streaming reader for a raw asset. Symmetric with raw_writer().
 
+    compression=None (default) reads the stored bytes. "detect" (or
+    "gzip"/"zstd") decompresses by the file's magic bytes, for assets
+    written with a codec; "bz2"/"xz" decompress through fsspec.
+
     Honors the SSD mirror fallback in dev mode: if the asset is missing
     from the local dev dir but present in the mirror, it reads from the
     mirror path transparently.
     """
     from .tracking import record_read
     uri = raw_uri(asset_id, extension)
+    _settle(uri)
 
-    # Dev mode mirror fallback
+    # Dev mode mirror fallback; remote reads through the disk cache
     target = uri
     if not uri.startswith("s3://") and not Path(uri).exists():
         mirror = mirror_raw_path(asset_id, extension)
         if mirror is not None and mirror.exists():
             target = str(mirror)
+    cache = cache_for(uri)
+    if cache is not None:
+        target = cache.path(uri, get_fs(uri))
+        if target is None:
+            raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found at {uri}")
 
     fs = get_fs(target)
-    open_kwargs = {}
-    if "t" in mode:
-        open_kwargs["encoding"] = encoding
-    if compression is not None:
-        open_kwargs["compression"] = compression
-    with fs.open(target, mode=mode, **open_kwargs) as f:
-        yield f
+    if compression == "detect" or compression in codecs.CODECS:
+        with fs.open(target, mode="rb") as f:
+            with _codec_stream(
+                f, mode, encoding, lambda raw: codecs.decompressing_reader(raw, _dictionary_by_id)
+            ) as stream:
+                yield stream
+    else:
+        open_kwargs = {}
+        if "t" in mode:
+            open_kwargs["encoding"] = encoding
+        if compression is not None:
+            open_kwargs["compression"] = compression
+        with fs.open(target, mode=mode, **open_kwargs) as f:
+            yield f
     record_read(f"raw/{asset_id}.{extension}")
 
 
@@ -448,17 +1603,399 @@ def raw_parquet_writer(asset_id: str, schema: pa.Schema, *, compression: str = "
     """
     from .tracking import record_write
     uri = raw_uri(asset_id, "parquet")
+    _settle(uri)
     fs = get_fs(uri)
+    _manifest_open()
     with fs.open(uri, "wb") as f:
         writer = pq.ParquetWriter(f, schema, compression=compression)
         try:
             yield writer
         finally:
             writer.close()
+    _manifest_record(asset_id, "parquet", uri=uri)
     print(f"  -> Saved {asset_id}.parquet (streamed)")
     record_write(f"raw/{asset_id}.parquet")
 
 
+# =============================================================================
+# Raw manifest — index of remote raw assets
+#
+# With raw on object storage, listing, existence and "which extension is
+# it" checks are each a round trip (or a full glob). The manifest is a
+# per-connector index {"<asset_id>.<ext>": {"size", "hash", "mtime"}},
+# updated by every save_raw_*, raw_writer, raw_parquet_writer and
+# delete_raw_file. For remote raw it answers list_raw_files,
+# raw_asset_exists and extension lookups from memory.
+#
+# Concurrent nodes never rewrite each other's changes. Each writing
+# process has its own change file, state `_raw_manifest_writers/<token>`:
+# written "open" before its first change and rewritten "done", with all
+# its changes, at the node exit barrier (flush_io()). Readers merge the
+# base snapshot (state `_raw_manifest`) with the change files it hasn't
+# folded yet; per path the entry with the latest mtime wins, and
+# deletes are timestamped tombstones, so merge order doesn't matter and
+# re-merging a change file is harmless.
+#
+# - Open change files are merged too. Their writer is mid-node, so its
+#   writes may be on storage before its change file records them; while
+#   one is open, a lookup the manifest misses probes storage. With no
+#   other writer open the manifest is authoritative: a miss is final.
+# - Storage is listed only when the base is missing or corrupt, or an
+#   open change file is older than the writer TTL: its writer died, and
+#   its writes are recorded nowhere. The listing becomes the new base
+#   and the dead writers' files are removed.
+# - At its barrier a writer folds every done change file into the base.
+#   A change file is removed once a stored base has held it for the fold
+#   grace period, so a concurrent fold working from an older base still
+#   finds it.
+#
+# Local raw dirs are probed directly, as before; the manifest isn't used
+# there.
+# =============================================================================
+
+_MANIFEST_STATE = "_raw_manifest"
+_MANIFEST_WRITERS = "_raw_manifest_writers"
+# Open change files older than this belong to dead writers (a GitHub
+# Actions job runs at most 6 hours)
+_MANIFEST_WRITER_TTL_S = 6 * 3600
+# Folded change files are removed after this; tombstones are kept longer
+# than any change file can outlive its writer
+_MANIFEST_FOLD_GRACE_S = 3600
+_MANIFEST_TOMBSTONE_S = 7 * 86400
+
+
+def _is_remote(uri: str) -> bool:
+    return "://" in uri
+
+
+def _raw_base() -> str:
+    # raw_uri only builds the path; "__probe__" is never created
+    return raw_uri("__probe__", "__").rsplit("/", 1)[0]
+
+
+def _mtime_epoch(info: dict) -> float | None:
+    mtime = info.get("LastModified") or info.get("mtime") or info.get("created")
+    if isinstance(mtime, datetime):
+        if mtime.tzinfo is None:
+            mtime = mtime.replace(tzinfo=timezone.utc)
+        return mtime.timestamp()
+    return float(mtime) if isinstance(mtime, (int, float)) else None
+
+
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+def _merge_manifest(files: dict, changes: dict) -> None:
+    """Apply `changes` to `files` in place, the latest entry per path
+    winning. Tombstones ({"deleted": True, "mtime"}) stay in `files`."""
+    for rel_path, entry in changes.items():
+        current = files.get(rel_path)
+        if current is None or (entry.get("mtime") or 0) >= (current.get("mtime") or 0):
+            files[rel_path] = entry
+
+
+def _live(files: dict) -> dict:
+    return {rel_path: entry for rel_path, entry in files.items() if not entry.get("deleted")}
+
+
+class _RawManifest:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._base: str | None = None
+        self._pid: int | None = None
+        self._files: dict[str, dict] | None = None
+        # This process's changes (tombstones for deletes), written to its
+        # own change file
+        self._changes: dict[str, dict] = {}
+        self._token: str | None = None
+        self._started: float | None = None
+        self._authoritative = False
+
+    def active(self) -> bool:
+        return _is_remote(_raw_base())
+
+    def _writer_uri(self, token: str) -> str:
+        return state_uri(f"{_MANIFEST_WRITERS}/{token}")
+
+    def _store_base(self, files: dict, folded: dict) -> None:
+        payload = {"files": files, "folded": folded, "_metadata": _state_metadata()}
+        # Synchronous, like the change files: they must land before the
+        # writes they describe are relied on
+        _write_bytes_atomic(
+            state_uri(_MANIFEST_STATE),
+            json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            defer=False,
+        )
+
+    def _store_changes(self, done: bool) -> None:
+        payload = {
+            "started": self._started, "done": done,
+            "changes": self._changes, "_metadata": _state_metadata(),
+        }
+        _write_bytes_atomic(
+            self._writer_uri(self._token),
+            json.dumps(payload, separators=(",", ":")).encode("utf-8"),
+            defer=False,
+        )
+
+    def _writers(self) -> dict[str, dict]:
+        """Every writer's change file, by token. One listing plus one
+        batched read."""
+        base = self._writer_uri("__probe__").rsplit("/", 1)[0]
+        fs = get_fs(base)
+        try:
+            names = [p.rsplit("/", 1)[-1] for p in fs.ls(base, detail=False)]
+        except FileNotFoundError:
+            return {}
+        uris = {name[:-len(".json")]: f"{base}/{name}" for name in names if name.endswith(".json")}
+        if not uris:
+            return {}
+        found = _fetch_batch(list(uris.values()))
+        return {token: json.loads(found[uri]) for token, uri in uris.items() if uri in found}
+
+    def _scan(self) -> dict[str, dict]:
+        base = _raw_base()
+        fs = get_fs(base)
+        try:
+            found = fs.find(base, detail=True)
+        except FileNotFoundError:
+            return {}
+        prefix = fs._strip_protocol(base).rstrip("/") + "/"
+        files = {}
+        for path, info in found.items():
+            rel = fs._strip_protocol(path)
+            rel = rel[len(prefix):] if rel.startswith(prefix) else rel
+            files[rel] = {
+                "size": info.get("size"),
+                "hash": (info.get("ETag") or "").strip('"') or None,
+                "mtime": _mtime_epoch(info),
+            }
+        return files
+
+    def _load(self) -> dict[str, dict]:
+        """The merged view: base + every unfolded change file, open or
+        done. Lists storage only when the base is missing or corrupt, or
+        a dead writer left writes no change file records."""
+        stored = load_state(_MANIFEST_STATE)
+        writers = self._writers()
+        now = _now()
+        running = {
+            token: w for token, w in writers.items()
+            if not w.get("done") and token != self._token
+        }
+        dead = [t for t, w in running.items() if now - (w.get("started") or 0) > _MANIFEST_WRITER_TTL_S]
+        self._authoritative = len(dead) == len(running)
+        if isinstance(stored.get("files"), dict) and not dead:
+            files = dict(stored["files"])
+            folded = stored.get("folded", {})
+            for token, w in writers.items():
+                if token not in folded:
+                    _merge_manifest(files, w.get("changes", {}))
+            return _live(files)
+
+        files = self._scan()
+        if self._authoritative:
+            # No live writer: the listing is complete. It subsumes every
+            # done change file, and the dead writers' unrecorded writes.
+            folded = {t: now for t, w in writers.items() if w.get("done")}
+            self._store_base(files, folded)
+            for token in dead:
+                _delete(self._writer_uri(token))
+        return files
+
+    def authoritative(self) -> bool:
+        """True if no other writer was open when the view was loaded, so
+        a miss means the asset doesn't exist."""
+        with self._lock:
+            self.files()
+            return self._authoritative
+
+    def files(self) -> dict[str, dict]:
+        with self._lock:
+            base = _raw_base()
+            if base != self._base or os.getpid() != self._pid:
+                # New connector, or a forked child: don't reuse the parent's
+                self._base, self._pid = base, os.getpid()
+                self._files, self._changes, self._token = None, {}, None
+            if self._files is None:
+                self._files = self._load()
+            return self._files
+
+    def open(self) -> None:
+        """Register this process as a writer before its first change."""
+        with self._lock:
+            self.files()
+            if self._token is not None:
+                return
+            self._token = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            self._started = _now()
+            self._store_changes(done=False)
+            _register_barrier(self.flush)
+
+    def record(self, rel_path: str, *, size: int | None, hash: str | None, mtime: float | None = None) -> None:
+        with self._lock:
+            self.open()
+            entry = {"size": size, "hash": hash, "mtime": mtime if mtime is not None else _now()}
+            self._files[rel_path] = self._changes[rel_path] = entry
+
+    def record_uri(self, rel_path: str, uri: str) -> None:
+        """Record an asset written as a stream, from its object info."""
+        try:
+            info = get_fs(uri).info(uri)
+        except FileNotFoundError:
+            return
+        self.record(
+            rel_path, size=info.get("size"),
+            hash=(info.get("ETag") or "").strip('"') or None, mtime=_mtime_epoch(info),
+        )
+
+    def discard(self, rel_path: str) -> None:
+        with self._lock:
+            self.open()
+            self._files.pop(rel_path, None)
+            self._changes[rel_path] = {"deleted": True, "mtime": _now()}
+
+    def flush(self) -> None:
+        """Mark this process's change file done, fold the done change
+        files into the base and deregister as a writer."""
+        with self._lock:
+            if self._token is None or os.getpid() != self._pid:
+                return
+            self._store_changes(done=True)
+
+            stored = load_state(_MANIFEST_STATE)
+            if isinstance(stored.get("files"), dict):
+                files, folded = dict(stored["files"]), dict(stored.get("folded", {}))
+            else:
+                files, folded = self._scan(), {}
+            writers = self._writers()
+            now = _now()
+            for token, w in writers.items():
+                if w.get("done") and token not in folded:
+                    _merge_manifest(files, w.get("changes", {}))
+                    folded[token] = now
+            # Remove change files a stored base has held past the grace
+            # period; only the stored base's fold times count
+            expired = [
+                t for t, at in stored.get("folded", {}).items()
+                if now - at > _MANIFEST_FOLD_GRACE_S
+            ]
+            for token in expired:
+                folded.pop(token, None)
+            files = {
+                rel_path: entry for rel_path, entry in files.items()
+                if not entry.get("deleted") or now - (entry.get("mtime") or 0) < _MANIFEST_TOMBSTONE_S
+            }
+            self._store_base(files, folded)
+            for token in expired:
+                if token in writers:
+                    _delete(self._writer_uri(token))
+            self._files, self._changes, self._token = _live(files), {}, None
+
+
+_manifest = _RawManifest()
+
+
+def _manifest_open() -> None:
+    """Call before a raw write or delete (no-op for local raw)."""
+    if _manifest.active():
+        _manifest.open()
+
+
+def _manifest_record(asset_id: str, ext: str, data: bytes | None = None, uri: str | None = None) -> None:
+    """Update the manifest after a raw write (no-op for local raw)."""
+    if not _manifest.active():
+        return
+    rel = f"{asset_id}.{ext}"
+    if data is not None:
+        _manifest.record(rel, size=len(data), hash=hashlib.md5(data).hexdigest())
+    else:
+        _manifest.record_uri(rel, uri or raw_uri(asset_id, ext))
+
+
+def _manifest_entry(asset_id: str, ext: str) -> dict | None:
+    return _manifest.files().get(f"{asset_id}.{ext}")
+
+
+def _manifest_extension(asset_id: str, extensions) -> str | None:
+    """First of `extensions` the manifest has for asset_id."""
+    files = _manifest.files()
+    for ext in extensions:
+        if f"{asset_id}.{ext}" in files:
+            return ext
+    return None
+
+
+def _glob_regex(pattern: str) -> re.Pattern:
+    """fs.glob semantics: * and ? stay within a path segment, ** spans them."""
+    out, i = [], 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif pattern[i] == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            else:
+                out.append(pattern[i:j + 1].replace("[!", "[^"))
+                i = j + 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+# =============================================================================
+# I/O barrier
+#
+# Work deferred past a write call (manifest updates, ...) registers a
+# flush here. flush_io() runs them all; the orchestrator calls it when a
+# node's function returns, inside the node, so a failing flush fails the
+# node. Also run at interpreter exit for scripts run outside the DAG.
+# =============================================================================
+
+_barriers: list = []
+_barriers_lock = threading.Lock()
+
+
+def _register_barrier(fn) -> None:
+    with _barriers_lock:
+        if fn not in _barriers:
+            _barriers.append(fn)
+
+
+def flush_io() -> None:
+    """Durability barrier: complete all deferred raw/state I/O.
+
+    Raises if a write-behind upload failed.
+    """
+    uploader = _get_write_behind()
+    # Uploads land before barriers (the manifest) record them as done
+    if uploader is not None:
+        uploader.flush()
+    with _barriers_lock:
+        pending = list(_barriers)
+    for fn in pending:
+        fn()
+    if uploader is not None:
+        uploader.flush()
+
+
+atexit.register(flush_io)
+
+
 # =============================================================================
 # Listing & existence checks
 # =============================================================================
@@ -472,6 +2009,10 @@ def list_raw_files(pattern: str) -> list[str]:
     Returns:
         Sorted list of relative paths.
     """
+    if _manifest.active():
+        regex = _glob_regex(pattern)
+        return sorted(p for p in _manifest.files() if regex.match(p))
+
     # Probe raw_uri to get the connector's raw dir (s3:// or local). The
     # "__probe__" asset is never created — raw_uri only builds the path.
     probe = raw_uri("__probe__", "__")
@@ -511,7 +2052,18 @@ def raw_asset_exists(asset_id: str, ext: str = "parquet", max_age_days: int | No
     """
     uri = raw_uri(asset_id, ext)
 
-    if uri.startswith("s3://"):
+    if _manifest.active():
+        entry = _manifest_entry(asset_id, ext)
+        if entry is not None:
+            if max_age_days is None or entry.get("mtime") is None:
+                return True
+            age = datetime.now(timezone.utc).timestamp() - entry["mtime"]
+            return age < max_age_days * 86400
+        # A miss falls through to storage only while another writer is open
+        if _manifest.authoritative():
+            return False
+
+    if _is_remote(uri):
         fs = get_fs(uri)
         if not fs.exists(uri):
             return False
@@ -0,0 +1,228 @@
+"""Merge key validation for in-memory tables and streamed sources.
+
+merge() needs its key to be non-null and unique in the source; a
+duplicate key makes the MERGE ambiguous and a null key never matches.
+
+- validate_keys() checks a pa.Table exactly, with a vectorized group-by
+  over the key columns (no casting or string joins for composite keys).
+- KeyValidator checks a stream batch by batch without holding it: each
+  row's key columns are reduced to a 64-bit fingerprint (DuckDB's
+  hash()), nulls are rejected as they arrive, and fingerprints are kept
+  as compact uint64 arrays. Past a memory cap they spill to Parquet in a
+  temp directory and the final duplicate check runs out of core.
+- validating_reader() tees a RecordBatchReader through a KeyValidator.
+  The duplicate check runs when the stream is exhausted, so a violation
+  raises inside the consumer (e.g. a Delta merge) before it commits.
+
+Fingerprints can collide, so a streamed duplicate is a 64-bit hash match;
+at 10M keys the chance of a false positive is about 3 in a million.
+
+Config (env vars):
+    DELTA_KEYCHECK_MEMORY_BYTES: fingerprint bytes held in memory before
+        spilling to disk (default 256 MB, ~32M keys)
+"""
+
+import os
+import shutil
+import tempfile
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+def _memory_cap() -> int:
+    return int(os.environ.get("DELTA_KEYCHECK_MEMORY_BYTES", 256 * 1024 * 1024))
+
+
+def _quote(column: str) -> str:
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _to_table(result) -> pa.Table:
+    # DuckDB ≥1.4 returns a RecordBatchReader from .arrow(); older versions a Table.
+    return result.read_all() if isinstance(result, pa.RecordBatchReader) else result
+
+
+def _check_columns(schema: pa.Schema, keys: list[str], name: str) -> None:
+    for k in keys:
+        if k not in schema.names:
+            raise ValueError(f"[{name}] Key column '{k}' not found. Columns: {schema.names}")
+
+
+def _check_nulls(data, keys: list[str], name: str) -> None:
+    for k in keys:
+        null_count = data.column(k).null_count
+        if null_count > 0:
+            raise ValueError(f"[{name}] Key column '{k}' has {null_count} nulls. Merge keys cannot be null.")
+
+
+def _duplicate_error(keys: list[str], name: str, dup_count: int, streamed: bool = False) -> ValueError:
+    what = f"Key '{keys[0]}' has {dup_count} duplicate values" if len(keys) == 1 else \
+        f"Key {keys} has {dup_count} duplicate combinations"
+    where = " in the streamed source" if streamed else ""
+    return ValueError(
+        f"[{name}] {what}{where}. "
+        f"Merge key must be unique. Check your data or add more columns to key."
+    )
+
+
+def validate_keys(table: pa.Table, keys: list[str], name: str) -> None:
+    """Validate key columns of an in-memory table before merge.
+
+    Checks:
+    1. Key columns exist
+    2. Key columns have no nulls
+    3. Key combination is unique (no duplicates)
+
+    Raises:
+        ValueError describing the first violation found.
+    """
+    _check_columns(table.schema, keys, name)
+    _check_nulls(table, keys, name)
+
+    if len(keys) == 1:
+        unique_count = pc.count_distinct(table.column(keys[0])).as_py()
+    else:
+        unique_count = table.select(keys).group_by(keys).aggregate([]).num_rows
+    if unique_count != table.num_rows:
+        raise _duplicate_error(keys, name, table.num_rows - unique_count)
+
+
+class KeyValidator:
+    """Incremental key check over a stream of record batches.
+
+    Usage:
+        checker = KeyValidator(["date"], "my_dataset")
+        for batch in batches:
+            checker.update(batch)   # raises on missing/null keys
+        checker.finish()            # raises on duplicates
+
+    duplicates() returns the count instead of raising. With `sample`,
+    only that fraction of distinct keys is tracked (see __init__).
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        name: str,
+        *,
+        memory_bytes: int | None = None,
+        sample: float | None = None,
+    ):
+        self.keys = list(keys)
+        self.name = name
+        self.rows = 0
+        # Sampling keeps the keys whose fingerprint falls in the lowest
+        # `sample` fraction of the hash space, so every copy of a sampled
+        # key is kept and duplicates among them are counted exactly.
+        self.sample = sample
+        self._threshold = int(sample * 2**64) if sample is not None and sample < 1 else None
+        self.memory_bytes = _memory_cap() if memory_bytes is None else memory_bytes
+        self._con = duckdb.connect()
+        self._select = f"SELECT hash({', '.join(_quote(k) for k in self.keys)}) AS h FROM batch"
+        self._pending: list[pa.Array] = []
+        self._pending_bytes = 0
+        self._spill_dir: str | None = None
+        self._spills: list[str] = []
+        self.error: ValueError | None = None
+
+    def update(self, batch: pa.RecordBatch) -> None:
+        """Fingerprint one batch's keys. Raises on missing or null keys."""
+        if self.rows == 0:
+            _check_columns(batch.schema, self.keys, self.name)
+        _check_nulls(batch, self.keys, self.name)
+        if batch.num_rows == 0:
+            return
+
+        batch = pa.Table.from_batches([batch.select(self.keys)])
+        self._con.register("batch", batch)
+        try:
+            hashes = _to_table(self._con.execute(self._select).arrow()).column("h").combine_chunks()
+        finally:
+            self._con.unregister("batch")
+
+        if self._threshold is not None:
+            hashes = hashes.filter(pc.less(hashes, pa.scalar(self._threshold, pa.uint64())))
+        self.rows += len(hashes)
+        self._pending.append(hashes)
+        self._pending_bytes += hashes.nbytes
+        if self._pending_bytes >= self.memory_bytes:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="keycheck-")
+        path = os.path.join(self._spill_dir, f"part-{len(self._spills):05d}.parquet")
+        pq.write_table(pa.table({"h": pa.chunked_array(self._pending, pa.uint64())}), path, compression="none")
+        self._spills.append(path)
+        self._pending = []
+        self._pending_bytes = 0
+
+    def _unique_count(self) -> int:
+        if not self._spills:
+            return pc.count_distinct(pa.chunked_array(self._pending, pa.uint64())).as_py()
+
+        # Out of core: DuckDB's aggregation spills to the same temp dir
+        # under a memory limit matching ours.
+        self._spill()
+        self._con.execute(f"SET memory_limit='{max(self.memory_bytes // (1024 * 1024), 64)}MB'")
+        self._con.execute(f"SET temp_directory='{self._spill_dir}'")
+        files = ", ".join(f"'{p}'" for p in self._spills)
+        result = self._con.execute(f"SELECT count(DISTINCT h) FROM read_parquet([{files}])").fetchone()
+        return result[0]
+
+    def duplicates(self) -> int:
+        """Rows seen minus distinct keys seen. Releases resources."""
+        try:
+            return self.rows - self._unique_count() if self.rows else 0
+        finally:
+            self.close()
+
+    def finish(self) -> None:
+        """Run the duplicate check over everything seen. Raises on duplicates."""
+        dup_count = self.duplicates()
+        if dup_count:
+            raise _duplicate_error(self.keys, self.name, dup_count, streamed=True)
+
+    def close(self) -> None:
+        """Release fingerprints, spill files and the DuckDB connection."""
+        self._pending = []
+        self._pending_bytes = 0
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+            self._spills = []
+        self._con.close()
+
+
+def validating_reader(
+    reader: pa.RecordBatchReader, keys: list[str], name: str
+) -> tuple[pa.RecordBatchReader, KeyValidator]:
+    """Tee a reader through a KeyValidator.
+
+    Batches pass through unchanged. Missing or null keys raise on the
+    offending batch, duplicates once the stream is exhausted — in both
+    cases inside whoever consumes the reader, before a merge can commit.
+    Consumers that wrap errors (deltalake raises DeltaError) can recover
+    the original from `validator.error`.
+
+    Returns:
+        (reader, validator)
+    """
+    validator = KeyValidator(keys, name)
+
+    def batches():
+        try:
+            for batch in reader:
+                validator.update(batch)
+                yield batch
+            validator.finish()
+        except ValueError as e:
+            validator.error = e
+            raise
+        finally:
+            validator.close()
+
+    return pa.RecordBatchReader.from_batches(reader.schema, batches()), validator
@@ -0,0 +1,310 @@
+"""Delta table maintenance: compaction, z-ordering, vacuum.
+
+Every merge/overwrite/append adds Parquet files and a log entry, and
+merges tombstone the files they rewrite. Left alone, a daily-updated
+table drifts towards many small files plus a growing pile of
+unreferenced ones, which slows both consumer scans and our own merges.
+
+delta.py calls maybe_maintain() after each write. It reads file
+statistics from the table's add actions, and only acts past the policy
+thresholds:
+
+- compaction (optionally z-ordered by the merge key) when the table has
+  enough files and enough of them are small
+- vacuum when files past the retention window hold enough bytes
+
+Tombstoned (removed, not yet vacuumed) files come from one listing of
+the table directory. delta.py lists only on the checkpoint cadence and
+carries the result forward between listings with the log's remove
+actions (see carry_tombstones()); when neither is available the
+tombstones are unknown and the vacuum check waits for the next listing.
+
+The outcome is attached to the write's materialization in run.json.
+
+Policy (env vars, read per call):
+    DELTA_MAINTENANCE: "0" disables automatic maintenance (default on)
+    DELTA_SMALL_FILE_BYTES: files below this size are small (default 16 MB)
+    DELTA_COMPACT_MIN_FILES: min live files before compacting (default 8)
+    DELTA_COMPACT_SMALL_RATIO: min fraction of small files (default 0.5)
+    DELTA_COMPACT_TARGET_BYTES: compaction target file size (default 128 MB)
+    DELTA_ZORDER: "1" z-orders by the merge key when compacting (default off)
+    DELTA_VACUUM_MIN_BYTES: min vacuumable bytes before vacuuming (default 64 MB)
+    DELTA_VACUUM_RETENTION_HOURS: keep removed files this long (default 168)
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from urllib.parse import unquote
+
+import pyarrow as pa
+from deltalake import DeltaTable, WriterProperties
+
+from .config import get_fs
+from .tracking import annotate_asset
+
+
+@dataclass
+class MaintenancePolicy:
+    small_file_bytes: int = 16 * 1024 * 1024
+    compact_min_files: int = 8
+    compact_small_ratio: float = 0.5
+    compact_target_bytes: int = 128 * 1024 * 1024
+    zorder: bool = False
+    vacuum_min_bytes: int = 64 * 1024 * 1024
+    vacuum_retention_hours: int = 168
+
+    @classmethod
+    def from_env(cls) -> "MaintenancePolicy":
+        """Build a policy from DELTA_* env vars, defaulting unset ones."""
+        default = cls()
+        env = os.environ.get
+        return cls(
+            small_file_bytes=int(env("DELTA_SMALL_FILE_BYTES", default.small_file_bytes)),
+            compact_min_files=int(env("DELTA_COMPACT_MIN_FILES", default.compact_min_files)),
+            compact_small_ratio=float(env("DELTA_COMPACT_SMALL_RATIO", default.compact_small_ratio)),
+            compact_target_bytes=int(env("DELTA_COMPACT_TARGET_BYTES", default.compact_target_bytes)),
+            zorder=env("DELTA_ZORDER", "0") == "1",
+            vacuum_min_bytes=int(env("DELTA_VACUUM_MIN_BYTES", default.vacuum_min_bytes)),
+            vacuum_retention_hours=int(env("DELTA_VACUUM_RETENTION_HOURS", default.vacuum_retention_hours)),
+        )
+
+
+def _enabled() -> bool:
+    return os.environ.get("DELTA_MAINTENANCE", "1") != "0"
+
+
+def _data_file_sizes(uri: str) -> dict[str, int]:
+    """{relative path: size} for every data file under the table root.
+
+    One recursive listing; the transaction log is excluded.
+    """
+    fs = get_fs(uri)
+    root = fs.info(uri)["name"].rstrip("/")
+    sizes = {}
+    for path, info in fs.find(uri, detail=True).items():
+        rel = path[len(root) + 1:] if path.startswith(root + "/") else path
+        if rel.startswith("_delta_log/") or info.get("type") == "directory":
+            continue
+        sizes[rel] = int(info.get("size") or 0)
+    return sizes
+
+
+def file_layout(dt: DeltaTable, uri: str, adds: pa.RecordBatch | None = None) -> tuple[dict[str, int], dict[str, int]]:
+    """({path: size} of live files, {path: size} of tombstoned files).
+
+    Live files come from the add actions (pass `adds` if already loaded),
+    tombstoned ones are whatever else is on storage.
+    """
+    if adds is None:
+        # deltalake ≥1.0 returns an arro3 RecordBatch; bridge to pyarrow.
+        adds = pa.record_batch(dt.get_add_actions(flatten=True))
+    live = live_files(adds)
+    on_storage = _data_file_sizes(uri)
+    tombstoned = {p: s for p, s in on_storage.items() if p not in live}
+    return live, tombstoned
+
+
+def live_files(adds: pa.RecordBatch) -> dict[str, int]:
+    """{path: size} of the live files in a version's add actions."""
+    return {
+        unquote(p): s
+        for p, s in zip(adds.column("path").to_pylist(), adds.column("size_bytes").to_pylist())
+    }
+
+
+# Past this many commits a listing is cheaper than reading each one
+_MAX_CARRIED_COMMITS = 100
+
+
+def carry_tombstones(
+    uri: str,
+    layout: tuple[dict[str, int], dict[str, int]],
+    since_version: int,
+    version: int,
+    live: dict[str, int],
+) -> dict[str, int] | None:
+    """Tombstoned files at `version`, from file_layout() at `since_version`
+    plus the remove actions of the commits in between.
+
+    Reads one small commit file per version instead of listing the table.
+    None if a commit file is gone (log cleanup) or there are too many.
+    """
+    if version - since_version > _MAX_CARRIED_COMMITS:
+        return None
+    previous_live, tombstoned = layout
+    sizes = dict(previous_live)
+    tombstoned = dict(tombstoned)
+    log_uri = f"{uri.rstrip('/')}/_delta_log"
+    fs = get_fs(log_uri)
+    for v in range(since_version + 1, version + 1):
+        try:
+            with fs.open(f"{log_uri}/{v:020d}.json", "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        for line in lines:
+            action = json.loads(line)
+            if "add" in action:
+                sizes[unquote(action["add"]["path"])] = action["add"].get("size") or 0
+            elif "remove" in action:
+                path = unquote(action["remove"]["path"])
+                tombstoned[path] = action["remove"].get("size") or sizes.get(path, 0)
+    return {p: s for p, s in tombstoned.items() if p not in live}
+
+
+def _health(
+    dt: DeltaTable,
+    uri: str,
+    policy: MaintenancePolicy,
+    layout: tuple[dict[str, int], dict[str, int] | None] | None = None,
+) -> tuple[dict, dict[str, int] | None]:
+    """table_health() plus the {path: size} map of tombstoned files
+    (None if the layout doesn't know them)."""
+    live, tombstoned = layout if layout is not None else file_layout(dt, uri)
+    small = sum(1 for s in live.values() if s < policy.small_file_bytes)
+
+    health = {
+        "files": len(live),
+        "live_bytes": sum(live.values()),
+        "small_files": small,
+        "small_file_ratio": round(small / len(live), 3) if live else 0.0,
+        "tombstone_files": len(tombstoned) if tombstoned is not None else None,
+        "tombstone_bytes": sum(tombstoned.values()) if tombstoned is not None else None,
+    }
+    return health, tombstoned
+
+
+def table_health(dt: DeltaTable, uri: str, policy: MaintenancePolicy | None = None) -> dict:
+    """File-layout statistics for a Delta table.
+
+    Returns:
+        files: live data files
+        live_bytes: bytes in live files
+        small_files / small_file_ratio: live files under policy.small_file_bytes
+        tombstone_files / tombstone_bytes: files on storage the current
+            version no longer references (removed but not yet vacuumed)
+    """
+    health, _ = _health(dt, uri, policy or MaintenancePolicy.from_env())
+    return health
+
+
+def maintain(
+    dt: DeltaTable,
+    uri: str,
+    name: str,
+    *,
+    zorder_by: list[str] | None = None,
+    policy: MaintenancePolicy | None = None,
+    force: bool = False,
+    writer_properties: WriterProperties | None = None,
+    target_size: int | None = None,
+    layout: tuple[dict[str, int], dict[str, int] | None] | None = None,
+) -> dict:
+    """Compact and vacuum a table when it is past the policy thresholds.
+
+    Runs through `dt`, so a cached handle advances in place. Both steps
+    commit with dataChange=false; readers see the same rows.
+
+    Args:
+        dt: Open handle for the table.
+        uri: Table URI (for the storage listing).
+        name: Dataset name (for logging and run.json).
+        zorder_by: Columns to z-order by when compacting (needs policy.zorder
+            or force=True; plain compaction otherwise).
+        policy: Thresholds; defaults to MaintenancePolicy.from_env().
+        force: Compact and vacuum regardless of thresholds.
+        writer_properties: Parquet settings for rewritten files (the
+            table's write profile), deltalake defaults if None.
+        target_size: Compaction target file size; overrides
+            policy.compact_target_bytes.
+        layout: file_layout() for the table's current version, if the
+            caller already has it (delta.table_stats() does), to skip
+            listing storage again. Its tombstones may be None (unknown):
+            then vacuum is skipped unless forced.
+
+    Returns:
+        Report dict: health before maintenance, plus "compacted" and
+        "vacuumed" entries when those steps ran.
+    """
+    policy = policy or MaintenancePolicy.from_env()
+    target_size = target_size or policy.compact_target_bytes
+    health, tombstones = _health(dt, uri, policy, layout)
+    report = {"health": health}
+
+    needs_compact = (
+        health["files"] >= policy.compact_min_files
+        and health["small_file_ratio"] >= policy.compact_small_ratio
+    )
+    if force or needs_compact:
+        if zorder_by and (policy.zorder or force):
+            metrics = dt.optimize.z_order(zorder_by, target_size=target_size, writer_properties=writer_properties)
+            report["zordered_by"] = list(zorder_by)
+        else:
+            metrics = dt.optimize.compact(target_size=target_size, writer_properties=writer_properties)
+        report["compacted"] = {
+            "files_removed": metrics.get("numFilesRemoved", 0),
+            "files_added": metrics.get("numFilesAdded", 0),
+        }
+        print(
+            f"[maintenance] {name}: compacted {report['compacted']['files_removed']} "
+            f"→ {report['compacted']['files_added']} files"
+        )
+
+    # Only files past retention are eligible; the dry run lists exactly
+    # those, sized from the listing we already have.
+    if tombstones is None and force:
+        tombstones = file_layout(dt, uri)[1]
+    if force or (tombstones is not None and health["tombstone_bytes"] >= policy.vacuum_min_bytes):
+        eligible = dt.vacuum(
+            retention_hours=policy.vacuum_retention_hours,
+            dry_run=True,
+            enforce_retention_duration=False,
+        )
+        eligible_bytes = sum(tombstones.get(unquote(p), 0) for p in eligible)
+        if eligible and (force or eligible_bytes >= policy.vacuum_min_bytes):
+            deleted = dt.vacuum(
+                retention_hours=policy.vacuum_retention_hours,
+                dry_run=False,
+                enforce_retention_duration=False,
+            )
+            report["vacuumed"] = {"files": len(deleted), "bytes": eligible_bytes}
+            print(
+                f"[maintenance] {name}: vacuumed {len(deleted)} files "
+                f"({eligible_bytes / 1024 / 1024:.1f} MB)"
+            )
+
+    return report
+
+
+def maybe_maintain(
+    dt: DeltaTable,
+    uri: str,
+    name: str,
+    *,
+    zorder_by: list[str] | None = None,
+    writer_properties: WriterProperties | None = None,
+    target_size: int | None = None,
+    layout: tuple[dict[str, int], dict[str, int] | None] | None = None,
+) -> dict | None:
+    """Post-write hook used by delta.py. Never fails the write.
+
+    Records the report on the materialization (run.json) and returns it,
+    or None when maintenance is disabled or errored.
+    """
+    if not _enabled():
+        return None
+    try:
+        report = maintain(
+            dt, uri, name,
+            zorder_by=zorder_by,
+            writer_properties=writer_properties,
+            target_size=target_size,
+            layout=layout,
+        )
+    except Exception as e:
+        print(f"⚠️  [maintenance] {name}: skipped ({e})")
+        return None
+    annotate_asset(f"subsets/{name}", maintenance=report)
+    return report
+
@@ -47,12 +47,15 @@ from pathlib import Path
 from typing import Callable
 
 from . import tracking
+from .io import flush_io
 from .tracking import (
     IORecord,
     clear_tracking,
     get_asset_version,
     get_assets_by_writer,
+    get_metrics,
     get_reads_by_task,
+    merge_metrics,
     set_current_task,
 )
 
@@ -136,6 +139,7 @@ def _child_entrypoint(fn: Callable, task_id: str, pipe_w) -> None:
                 "asset_writers": {asset_path: task_id},
                 "asset_versions": {asset_path: {"version": int, "hash": str}},
                 "io_records": [{"asset_path", "task_id", "operation", "stack"}],
+                "metrics": {task_id: {metric: number}},
             }
         }
     """
@@ -158,6 +162,9 @@ def _child_entrypoint(fn: Callable, task_id: str, pipe_w) -> None:
 
     try:
         ret = fn()
+        # Exit barrier: deferred raw/state I/O completes inside the node,
+        # so a failure there fails the node
+        flush_io()
         result["status"] = "done"
         if ret is True:
             result["needs_continuation"] = True
@@ -165,6 +172,10 @@ def _child_entrypoint(fn: Callable, task_id: str, pipe_w) -> None:
         result["status"] = "failed"
         result["error"] = str(e) or e.__class__.__name__
         result["traceback"] = traceback.format_exc()
+        try:
+            flush_io()  # record what did get written
+        except Exception:
+            pass
 
     finished_at = datetime.now(timezone.utc).isoformat()
     result["finished_at"] = finished_at
@@ -179,6 +190,7 @@ def _child_entrypoint(fn: Callable, task_id: str, pipe_w) -> None:
         "asset_writers": dict(tracking._asset_writers),
         "asset_versions": dict(tracking._asset_versions),
         "io_records": [asdict(r) for r in tracking._io_records],
+        "metrics": {t: dict(m) for t, m in tracking._task_metrics.items() if t},
     }
 
     # Flush stdio before sending result. Fork-inherited pipes can drop the
@@ -397,6 +409,7 @@ class DAG:
             tracking._asset_versions.update(snapshot.get("asset_versions", {}))
             for r in snapshot.get("io_records", []):
                 tracking._io_records.append(IORecord(**r))
+        merge_metrics(snapshot.get("metrics", {}))
 
     def run(self, targets: list[str] | None = None):
         """Execute all nodes in dependency order, each in its own forked
@@ -720,6 +733,9 @@ class DAG:
                 merged["subsets_reads"] = subsets_reads or merged.get("subsets_reads", [])
             if materializations or not merged.get("materializations"):
                 merged["materializations"] = materializations or merged.get("materializations", [])
+            metrics = get_metrics(task_id)
+            if metrics:
+                merged["metrics"] = metrics
             nodes_with_io.append(merged)
 
         return {
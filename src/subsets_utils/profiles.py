@@ -0,0 +1,97 @@
+"""Parquet write profiles for Delta tables.
+
+By default merge/overwrite/append write with deltalake's defaults
+(snappy, default row groups, statistics on every column). A WriteProfile
+tunes the Parquet layout of a table's files:
+
+- zstd_level: ZSTD compression at this level instead of the default codec
+- target_file_size: bytes per data file (also stored as the table's
+  delta.targetFileSize, which merge and optimize honour)
+- row_group_size: max rows per Parquet row group
+- stats_columns: only these columns collect Parquet statistics and
+  Delta data-skipping stats (delta.dataSkippingStatsColumns)
+- sort_by / sort_by_key: sort Table sources before writing
+- dictionary: force dictionary encoding on/off for every column
+
+Profiles resolve per call (profile=...), then per dataset
+(set_write_profile()), else no profile — deltalake defaults.
+
+Table properties are only written when they differ from the table's
+current configuration, so a stable profile costs no extra commits.
+"""
+
+from dataclasses import dataclass
+
+import pyarrow as pa
+from deltalake import ColumnProperties, WriterProperties
+
+
+@dataclass
+class WriteProfile:
+    zstd_level: int | None = None
+    target_file_size: int | None = None
+    row_group_size: int | None = None
+    stats_columns: list[str] | None = None
+    sort_by: list[str] | None = None
+    sort_by_key: bool = False
+    dictionary: bool | None = None
+
+    def writer_properties(self, schema: pa.Schema) -> WriterProperties | None:
+        """deltalake WriterProperties for a source with this schema, or None."""
+        kwargs = {}
+        if self.zstd_level is not None:
+            kwargs["compression"] = "ZSTD"
+            kwargs["compression_level"] = self.zstd_level
+        if self.row_group_size is not None:
+            kwargs["max_row_group_size"] = self.row_group_size
+        if self.dictionary is not None:
+            kwargs["default_column_properties"] = ColumnProperties(dictionary_enabled=self.dictionary)
+        if self.stats_columns is not None:
+            keep = set(self.stats_columns)
+            kwargs["column_properties"] = {
+                f.name: ColumnProperties(dictionary_enabled=self.dictionary, statistics_enabled="NONE")
+                for f in schema if f.name not in keep
+            }
+        return WriterProperties(**kwargs) if kwargs else None
+
+    def table_configuration(self) -> dict[str, str]:
+        """Delta table properties this profile implies."""
+        config = {}
+        if self.target_file_size is not None:
+            config["delta.targetFileSize"] = str(self.target_file_size)
+        if self.stats_columns is not None:
+            config["delta.dataSkippingStatsColumns"] = ",".join(self.stats_columns)
+        return config
+
+    def sort_columns(self, keys: list[str] | None = None) -> list[str] | None:
+        """Columns to sort Table sources by: sort_by, else the merge key."""
+        if self.sort_by:
+            return list(self.sort_by)
+        if self.sort_by_key and keys:
+            return list(keys)
+        return None
+
+
+_profiles: dict[str, WriteProfile] = {}
+
+
+def set_write_profile(name: str, profile: WriteProfile | None) -> None:
+    """Use `profile` for every write to dataset `name` (None clears it)."""
+    if profile is None:
+        _profiles.pop(name, None)
+    else:
+        _profiles[name] = profile
+
+
+def resolve_profile(name: str, profile: WriteProfile | None = None) -> WriteProfile | None:
+    """The profile for a write: per call, else per dataset, else None."""
+    return profile if profile is not None else _profiles.get(name)
+
+
+def sort_source(source, columns: list[str] | None):
+    """Sort a Table by `columns`. Readers pass through unchanged — they
+    can't be sorted without materializing, so callers stream them in
+    key order (as the datasets transform does)."""
+    if not columns or isinstance(source, pa.RecordBatchReader):
+        return source
+    return source.sort_by([(c, "ascending") for c in columns])
@@ -1,29 +1,25 @@
+import hashlib
 import json
-from deltalake import DeltaTable
 from .config import subsets_uri, get_storage_options
+from .delta import _open_table, _load_write_state, _save_write_state
 
 
-def publish(dataset_name: str, metadata: dict):
-    """Publish metadata to a Delta table."""
+def _check_required(metadata: dict) -> None:
     if 'id' not in metadata:
         raise ValueError("Missing required field: 'id'")
     if 'title' not in metadata:
         raise ValueError("Missing required field: 'title'")
 
-    uri = subsets_uri(dataset_name)
-    storage_opts = get_storage_options()
-    dt = DeltaTable(uri, storage_options=storage_opts) if storage_opts else DeltaTable(uri)
 
-    # Idempotent: skip if metadata unchanged
-    existing = json.loads(dt.metadata().description or "{}")
-    if existing == metadata:
-        print(f"Metadata unchanged for {dataset_name}")
-        return
+def _metadata_fingerprint(metadata: dict) -> str:
+    """Stable hash of a metadata dict, kept in the dataset's write state."""
+    canonical = json.dumps(metadata, sort_keys=True, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
 
-    # Validate column descriptions against actual schema
-    schema = dt.schema().to_pyarrow() if hasattr(dt.schema(), 'to_pyarrow') else dt.schema().to_arrow()
-    actual_columns = {field.name for field in schema}
 
+def _description_json(dataset_name: str, metadata: dict, actual_columns: set[str]) -> str:
+    """Validate metadata against the table's columns and serialize it for
+    the Delta table description."""
     if 'column_descriptions' in metadata:
         col_descs = json.loads(metadata['column_descriptions']) if isinstance(
             metadata['column_descriptions'], str
@@ -50,6 +46,44 @@ def publish(dataset_name: str, metadata: dict):
                 f"even after dropping column_descriptions; delta cap is 4000"
             )
         print(f"  Warning: column_descriptions omitted for {dataset_name} (metadata exceeded 4000 chars)")
+    return desc_json
+
+
+def publish(dataset_name: str, metadata: dict):
+    """Publish metadata to a Delta table.
+
+    The fingerprint of the last published metadata is kept in the
+    dataset's write state, so an unchanged publish returns without
+    opening the table. merge(..., metadata=...) records it too when it
+    creates the table with the description in the same commit.
+    """
+    _check_required(metadata)
+
+    fingerprint = _metadata_fingerprint(metadata)
+    if _load_write_state(dataset_name).get("metadata_fingerprint") == fingerprint:
+        print(f"Metadata unchanged for {dataset_name}")
+        return
+
+    uri = subsets_uri(dataset_name)
+    dt = _open_table(uri, get_storage_options())
+
+    # Idempotent: skip if metadata unchanged (first publish since the
+    # fingerprint was tracked, or the state was reset)
+    existing = json.loads(dt.metadata().description or "{}")
+    if existing == metadata:
+        _save_write_state(dataset_name, metadata_fingerprint=fingerprint)
+        print(f"Metadata unchanged for {dataset_name}")
+        return
+
+    # Validate column descriptions against actual schema
+    schema = dt.schema().to_pyarrow() if hasattr(dt.schema(), 'to_pyarrow') else dt.schema().to_arrow()
+    desc_json = _description_json(dataset_name, metadata, {field.name for field in schema})
 
+    before = dt.version()
     dt.alter.set_table_description(desc_json)
+    fields = {"metadata_fingerprint": fingerprint}
+    # Our own metadata commit shouldn't defeat no-op write elision.
+    if _load_write_state(dataset_name).get("version") == before:
+        fields["version"] = dt.version()
+    _save_write_state(dataset_name, **fields)
     print(f"Published metadata for {dataset_name}")
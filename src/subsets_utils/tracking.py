@@ -24,6 +24,9 @@ _asset_writers: dict[str, str] = {}
 # Track version info per asset: {asset_path: {"version": int, "hash": str}}
 _asset_versions: dict[str, dict] = {}
 
+# Per-task counters (conflicts, retries, cache hits...): {task_id: {metric: number}}
+_task_metrics: dict[str, dict[str, float]] = {}
+
 # Detailed IO records with stack traces
 @dataclass
 class IORecord:
@@ -34,7 +37,7 @@ class IORecord:
 
 _io_records: list[IORecord] = []
 
-# Guards _asset_writers / _asset_versions / _io_records against concurrent
+# Guards _asset_writers / _asset_versions / _task_metrics / _io_records against concurrent
 # access when DAG_PARALLELISM > 1.
 _lock = threading.RLock()
 
@@ -83,6 +86,44 @@ def record_write(asset_path: str, *, version: int = None, hash: str = None):
         ))
 
 
+def annotate_asset(asset_path: str, **fields):
+    """Attach extra fields to an asset's version info.
+
+    They ride along with {"version", "hash"} into the node's run.json
+    materializations. A later record_write() for the same asset replaces
+    them.
+    """
+    with _lock:
+        _asset_versions.setdefault(asset_path, {}).update(fields)
+
+
+def record_metric(metric: str, value: float = 1):
+    """Add `value` to a counter for the current task. Called by io/delta.
+
+    Counters end up under "metrics" in the node's run.json entry.
+    Outside a task they are kept under "" and not reported.
+    """
+    task_id = _current_task_id.get() or ""
+    with _lock:
+        counters = _task_metrics.setdefault(task_id, {})
+        counters[metric] = counters.get(metric, 0) + value
+
+
+def get_metrics(task_id: str) -> dict[str, float]:
+    """Get the counters recorded for a task."""
+    with _lock:
+        return dict(_task_metrics.get(task_id, {}))
+
+
+def merge_metrics(metrics: dict[str, dict[str, float]]):
+    """Add another process's {task_id: {metric: number}} into ours."""
+    with _lock:
+        for task_id, counters in metrics.items():
+            ours = _task_metrics.setdefault(task_id, {})
+            for metric, value in counters.items():
+                ours[metric] = ours.get(metric, 0) + value
+
+
 def record_read(asset_path: str):
     """Record that the current task read an asset. Called by io functions."""
     task_id = _current_task_id.get()
@@ -151,4 +192,5 @@ def clear_tracking():
     with _lock:
         _asset_writers.clear()
         _asset_versions.clear()
+        _task_metrics.clear()
         _io_records.clear()